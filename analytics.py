@@ -0,0 +1,124 @@
+import os
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from artifacts import DATA_PATH, cache_path, file_digest
+from dataset import read_dataset
+from features import FEATURE_LABELS, MAPPINGS
+
+# =============================
+# AGGREGATE CUBE
+# =============================
+# Every categorical column plus binned numeric columns, aggregated on
+# exam_score one way and for every pair of dimensions. Built once per CSV
+# version and persisted under the cache dir.
+TARGET = 'exam_score'
+QUANTILES = [0.25, 0.5, 0.75]
+
+NUMERIC_BINS = {
+    'age': ([16, 18, 20, 22, 24], ['17-18', '19-20', '21-22', '23-24']),
+    'study_hours': ([0, 2, 4, 6, 8, np.inf], ['0-2h', '2-4h', '4-6h', '6-8h', '8h+']),
+    'class_attendance': ([0, 50, 60, 70, 80, 90, 100], ['<50%', '50-60%', '60-70%', '70-80%', '80-90%', '90-100%']),
+    'sleep_hours': ([0, 5, 6, 7, 8, 9, 24], ['<5h', '5-6h', '6-7h', '7-8h', '8-9h', '9h+']),
+}
+
+DIMENSIONS = list(MAPPINGS) + list(NUMERIC_BINS)
+
+DIMENSION_LABELS = FEATURE_LABELS
+
+CUBE_COLUMNS = ['dim', 'value', 'dim2', 'value2', 'count', 'mean', 'p25', 'median', 'p75']
+
+
+def _dimension_frame(df):
+    dims = pd.DataFrame(index=df.index)
+    for col, mapping in MAPPINGS.items():
+        dims[col] = pd.Categorical(df[col], categories=sorted(mapping, key=mapping.get))
+    for col, (edges, labels) in NUMERIC_BINS.items():
+        dims[col] = pd.cut(df[col], bins=edges, labels=labels)
+    dims[TARGET] = df[TARGET].astype(float)
+    return dims
+
+
+def _aggregate(dims, keys):
+    grouped = dims.groupby(keys, observed=True)[TARGET]
+    stats = grouped.agg(['count', 'mean'])
+    quantiles = grouped.quantile(QUANTILES).unstack()
+    quantiles.columns = ['p25', 'median', 'p75']
+    return stats.join(quantiles).reset_index()
+
+
+def build_cube(df):
+    dims = _dimension_frame(df)
+    parts = []
+
+    for dim in DIMENSIONS:
+        agg = _aggregate(dims, [dim]).rename(columns={dim: 'value'})
+        agg.insert(0, 'dim', dim)
+        agg['dim2'] = ''
+        agg['value2'] = ''
+        parts.append(agg)
+
+    for dim, dim2 in combinations(DIMENSIONS, 2):
+        agg = _aggregate(dims, [dim, dim2]).rename(columns={dim: 'value', dim2: 'value2'})
+        agg.insert(0, 'dim', dim)
+        agg.insert(2, 'dim2', dim2)
+        parts.append(agg)
+
+    for part in parts:
+        part['value'] = part['value'].astype(str)
+        part['value2'] = part['value2'].astype(str)
+    cube = pd.concat(parts, ignore_index=True)[CUBE_COLUMNS]
+    cube['count'] = cube['count'].astype(np.int64)
+    return cube
+
+
+def load_cube(path=DATA_PATH):
+    # Persisted per CSV content hash; a changed CSV gets a fresh cube
+    target = cache_path(f"analytics_cube_{file_digest(path)}.pkl")
+    if os.path.exists(target):
+        return pd.read_pickle(target)
+
+    cube = build_cube(read_dataset(path, DIMENSIONS + [TARGET]))
+    tmp = f"{target}.{os.getpid()}.tmp"
+    cube.to_pickle(tmp)
+    os.replace(tmp, target)
+    return cube
+
+
+def slice_cube(cube, dim, dim2=None):
+    if dim2 is None or dim2 == dim:
+        return cube[(cube['dim'] == dim) & (cube['dim2'] == '')].drop(columns=['dim', 'dim2', 'value2'])
+
+    # Pairs are stored once, in DIMENSIONS order; flip if asked the other way
+    if DIMENSIONS.index(dim) > DIMENSIONS.index(dim2):
+        flipped = slice_cube(cube, dim2, dim)
+        return flipped.rename(columns={'value': 'value2', 'value2': 'value'})[flipped.columns]
+    return cube[(cube['dim'] == dim) & (cube['dim2'] == dim2)].drop(columns=['dim', 'dim2'])
+
+
+def pivot_slice(cube, dim, dim2, stat='mean'):
+    return slice_cube(cube, dim, dim2).pivot(index='value', columns='value2', values=stat)
+
+
+def derive_insights(cube, limit=5):
+    # One line per dimension comparing its best and worst group, largest gaps first
+    gaps = []
+    for dim in DIMENSIONS:
+        one_way = slice_cube(cube, dim)
+        best = one_way.loc[one_way['mean'].idxmax()]
+        worst = one_way.loc[one_way['mean'].idxmin()]
+        gaps.append((best['mean'] - worst['mean'], dim, best, worst))
+
+    gaps.sort(key=lambda g: g[0], reverse=True)
+    insights = []
+    for gap, dim, best, worst in gaps[:limit]:
+        insights.append(
+            f"• {DIMENSION_LABELS[dim]}: {best['value']} averages {best['mean']:.1f} vs "
+            f"{worst['value']} at {worst['mean']:.1f} ({gap:+.1f} points)"
+        )
+    flat = [DIMENSION_LABELS[dim] for gap, dim, _, _ in gaps if gap < 1.0]
+    if flat:
+        insights.append(f"• Little difference (< 1 point) across {', '.join(flat)}")
+    return insights
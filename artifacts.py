@@ -0,0 +1,43 @@
+import hashlib
+import os
+
+# =============================
+# ARTIFACT PATHS & FINGERPRINTS
+# =============================
+MODEL_PATH = os.environ.get('EXAM_MODEL_PATH', 'exam_model.h5')
+SCALER_PATH = os.environ.get('EXAM_SCALER_PATH', 'scaler.pkl')
+SCHEMA_PATH = os.environ.get('EXAM_SCHEMA_PATH', 'feature_schema.json')
+FOLDED_MODEL_PATH = os.environ.get('EXAM_FOLDED_MODEL_PATH', 'exam_model_folded.npz')
+DATA_PATH = os.environ.get('EXAM_DATA_PATH', 'Exam_Score_Prediction.csv')
+CACHE_DIR = os.environ.get('EXAM_CACHE_DIR', '.cache')
+
+# path -> ((size, mtime_ns), digest); files are only re-hashed when they change
+_digests = {}
+
+
+def file_digest(path):
+    stat = os.stat(path)
+    signature = (stat.st_size, stat.st_mtime_ns)
+    cached = _digests.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    digest = h.hexdigest()[:16]
+    _digests[path] = (signature, digest)
+    return digest
+
+
+def artifact_fingerprint(*paths):
+    # Content-based, so replicas with identical artifacts share a fingerprint
+    paths = paths or (MODEL_PATH, SCALER_PATH)
+    combined = '|'.join(file_digest(p) for p in paths)
+    return hashlib.sha256(combined.encode()).hexdigest()[:16]
+
+
+def cache_path(name):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, name)
@@ -0,0 +1,201 @@
+import argparse
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+# =============================
+# PREDICTION AUDIT LOG
+# =============================
+# log() only appends a tuple to an in-memory deque; a background thread
+# drains it in batches into SQLite (WAL mode, one transaction per batch), so
+# the rerun never waits on disk. Memory is bounded by max_pending: once it is
+# full, new records are dropped and counted ('drop', the default) or the
+# caller waits up to block_timeout for the writer to catch up ('block').
+AUDIT_DB = os.environ.get('EXAM_AUDIT_DB', 'predictions_audit.db')
+MAX_PENDING = 10_000
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    day TEXT NOT NULL,
+    model_version TEXT,
+    score REAL NOT NULL,
+    latency_ms REAL,
+    source TEXT,
+    profile TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS predictions_day ON predictions (day);
+"""
+
+
+class AuditLog:
+    def __init__(self, path=AUDIT_DB, max_pending=MAX_PENDING, batch_size=BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL, policy='drop', block_timeout=0.05):
+        if policy not in ('drop', 'block'):
+            raise ValueError(f"Unknown policy: {policy}")
+        self.path = path
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self._pending = deque()
+        self._wake = threading.Event()
+        self._stopping = False
+        self.logged = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.errors = 0
+        self._failed = 0
+        self.last_flush = None
+
+        db = sqlite3.connect(path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(_SCHEMA)
+        db.close()
+
+        self._thread = threading.Thread(target=self._run, daemon=True, name='audit-writer')
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, profile, score, model_version=None, latency_ms=None, source='app'):
+        # Request path: no serialization, no I/O. `profile` must not be
+        # mutated afterwards (the app builds a fresh dict per rerun).
+        if len(self._pending) >= self.max_pending:
+            if self.policy == 'drop' or not self._wait_for_room():
+                self.dropped += 1
+                return False
+        self._pending.append((time.time(), model_version, score, latency_ms, source, profile))
+        self.logged += 1
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+        return True
+
+    def _wait_for_room(self):
+        self._wake.set()
+        deadline = time.monotonic() + self.block_timeout
+        while len(self._pending) >= self.max_pending:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def _run(self):
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        try:
+            while not self._stopping or self._pending:
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                while self._pending:
+                    self._flush(db)
+        finally:
+            db.close()
+
+    def _flush(self, db):
+        batch = []
+        while self._pending and len(batch) < self.batch_size:
+            ts, version, score, latency_ms, source, profile = self._pending.popleft()
+            batch.append((ts, time.strftime('%Y-%m-%d', time.localtime(ts)), version, float(score),
+                          latency_ms, source, json.dumps(profile, default=str)))
+        try:
+            with db:
+                db.executemany(
+                    "INSERT INTO predictions (ts, day, model_version, score, latency_ms, source, profile) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", batch
+                )
+            self.written += len(batch)
+            self.batches += 1
+            self.last_flush = time.time()
+        except sqlite3.Error:
+            # Lost batch is counted; the writer keeps going
+            self.errors += 1
+            self.dropped += len(batch)
+            self._failed += len(batch)
+
+    def flush(self, timeout=5.0):
+        # Wait until everything logged so far is on disk (tests, shutdown)
+        target = self.logged
+        deadline = time.monotonic() + timeout
+        while self.written + self._failed < target and time.monotonic() < deadline:
+            self._wake.set()
+            time.sleep(0.005)
+        return self.written + self._failed >= target
+
+    def close(self):
+        if not self._stopping:
+            self._stopping = True
+            self._wake.set()
+            self._thread.join(timeout=5)
+
+    def stats(self):
+        return {
+            'logged': self.logged,
+            'written': self.written,
+            'pending': len(self._pending),
+            'dropped': self.dropped,
+            'batches': self.batches,
+            'errors': self.errors,
+            'last_flush': self.last_flush,
+            'policy': self.policy,
+            'max_pending': self.max_pending,
+        }
+
+
+def daily_aggregates(path=AUDIT_DB, days=30):
+    # One dict per day, newest first: count, score mean/min/max, latency
+    # mean/max and how many model versions served that day
+    if not os.path.exists(path):
+        return []
+    db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        db.row_factory = sqlite3.Row
+        rows = db.execute(
+            """
+            SELECT day,
+                   COUNT(*) AS predictions,
+                   AVG(score) AS mean_score,
+                   MIN(score) AS min_score,
+                   MAX(score) AS max_score,
+                   AVG(latency_ms) AS mean_latency_ms,
+                   MAX(latency_ms) AS max_latency_ms,
+                   COUNT(DISTINCT model_version) AS model_versions
+            FROM predictions
+            WHERE day >= ?
+            GROUP BY day
+            ORDER BY day DESC
+            """,
+            (time.strftime('%Y-%m-%d', time.localtime(time.time() - days * 86400)),)
+        ).fetchall()
+    finally:
+        db.close()
+    return [dict(row) for row in rows]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daily aggregates from the prediction audit log.")
+    parser.add_argument('--db', default=AUDIT_DB)
+    parser.add_argument('--days', type=int, default=30)
+    args = parser.parse_args(argv)
+
+    rows = daily_aggregates(args.db, args.days)
+    if not rows:
+        print("No predictions logged.")
+        return
+    print(f"{'day':<12}{'count':>8}{'mean':>8}{'min':>8}{'max':>8}{'lat ms':>9}{'max ms':>9}{'models':>8}")
+    for r in rows:
+        print(f"{r['day']:<12}{r['predictions']:>8}{r['mean_score']:>8.2f}{r['min_score']:>8.2f}{r['max_score']:>8.2f}"
+              f"{(r['mean_latency_ms'] or 0):>9.3f}{(r['max_latency_ms'] or 0):>9.3f}{r['model_versions']:>8}")
+
+
+if __name__ == '__main__':
+    main()
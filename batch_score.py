@@ -0,0 +1,118 @@
+import os
+
+# Parallelism comes from the process pool; keep BLAS single-threaded per
+# worker so the cores aren't oversubscribed. Must run before numpy loads.
+for _var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(_var, '1')
+
+import argparse
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from artifacts import FOLDED_MODEL_PATH, MODEL_PATH, SCALER_PATH
+from inference import load_serving_assets
+from scoring import BULK_CHUNK_ROWS, score_frame
+
+# =============================
+# HEADLESS BATCH SCORER
+# =============================
+# Streams a CSV in chunks, scores the chunks in a process pool and writes
+# them back in input order. Chunk boundaries depend only on --chunksize, so
+# the output is identical for any worker count.
+
+_model = None
+_scaler = None
+_neighbors = None
+_similar = 0
+
+
+def _init_worker(model_path, scaler_path, folded_path, similar):
+    global _model, _scaler, _neighbors, _similar
+    _model, _scaler = load_serving_assets(model_path, scaler_path, folded_path)
+    if similar:
+        from neighbors import load_index
+        _neighbors, _similar = load_index(scaler_path=scaler_path, model_path=model_path, folded_path=folded_path), similar
+
+
+def _score_chunk(chunk):
+    return score_frame(chunk, _model, _scaler, _neighbors, _similar).to_csv(index=False, header=False)
+
+
+def default_workers():
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def run(input_path, output_path, model_path=MODEL_PATH, scaler_path=SCALER_PATH,
+        chunksize=BULK_CHUNK_ROWS, workers=None, quiet=False, folded_path=FOLDED_MODEL_PATH, similar=0):
+    workers = workers or default_workers()
+    # Enough chunks queued to keep every worker busy, but bounded so memory
+    # doesn't grow with the input size
+    max_in_flight = workers * 2
+
+    if similar:
+        # Build (or validate) the persisted index once, before the workers load it
+        from neighbors import load_index
+        load_index(scaler_path=scaler_path, model_path=model_path, folded_path=folded_path)
+
+    start = time.perf_counter()
+    rows = 0
+
+    def report():
+        if not quiet:
+            elapsed = time.perf_counter() - start
+            print(f"\r{rows:,} rows  {rows / max(elapsed, 1e-9):,.0f} rows/sec", end='', file=sys.stderr)
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(model_path, scaler_path, folded_path, similar)) as pool, \
+            open(output_path, 'w', newline='') as out:
+        # Header first, CSV-quoted by pandas, so even a header-only input gets one
+        extra = ['predicted_score'] + (['similar_students_score'] if similar else [])
+        header = list(pd.read_csv(input_path, nrows=0).columns) + extra
+        pd.DataFrame(columns=header).to_csv(out, index=False)
+        pending = deque()
+        for chunk in pd.read_csv(input_path, chunksize=chunksize):
+            pending.append((len(chunk), pool.submit(_score_chunk, chunk)))
+
+            while len(pending) >= max_in_flight:
+                n, future = pending.popleft()
+                out.write(future.result())
+                rows += n
+                report()
+
+        while pending:
+            n, future = pending.popleft()
+            out.write(future.result())
+            rows += n
+            report()
+
+    elapsed = time.perf_counter() - start
+    if not quiet:
+        print(f"\nScored {rows:,} rows in {elapsed:.2f}s with {workers} workers "
+              f"({rows / max(elapsed, 1e-9):,.0f} rows/sec)", file=sys.stderr)
+    return rows, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a student CSV with the exam score model.")
+    parser.add_argument('input', help="CSV in the Exam_Score_Prediction.csv schema")
+    parser.add_argument('output', help="Where to write the scored CSV")
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--scaler', default=SCALER_PATH)
+    parser.add_argument('--folded', default=FOLDED_MODEL_PATH, help="Scaler-folded model, used when it matches --model/--scaler")
+    parser.add_argument('--chunksize', type=int, default=BULK_CHUNK_ROWS, help="Rows per chunk")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all available cores)")
+    parser.add_argument('--similar', type=int, default=0, metavar='K',
+                        help="Add the mean actual score of the K most similar students in the dataset")
+    parser.add_argument('--quiet', action='store_true')
+    args = parser.parse_args(argv)
+
+    run(args.input, args.output, args.model, args.scaler, args.chunksize, args.workers, args.quiet, args.folded, args.similar)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from artifacts import DATA_PATH, FOLDED_MODEL_PATH, MODEL_PATH, SCALER_PATH
+
+# =============================
+# BENCHMARK SUITE
+# =============================
+# Measures the numbers the Dashboard and System pages used to hardcode:
+#   startup_s        first render of student.py in a fresh process (AppTest)
+#   load_assets_s    cold import + model/scaler load in a fresh process
+#                    (just the folded model when it matches, see fold.py)
+#   single_row_*_ms  get_prediction() hot path (encode, scale, forward), uncached
+#   batch_*          predict_scores() throughput at several batch sizes
+#   peak_rss_mb      peak resident memory of the benchmark process
+# Results go to benchmark_results.json; thresholds in
+# benchmark_thresholds.json turn regressions into a non-zero exit code.
+RESULTS_PATH = os.environ.get('EXAM_BENCHMARK_RESULTS', 'benchmark_results.json')
+THRESHOLDS_PATH = 'benchmark_thresholds.json'
+BATCH_SIZES = (1, 32, 256, 4096, 65536)
+
+_STARTUP_SNIPPET = '''
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=300)
+at.run()
+print(json.dumps({"seconds": time.perf_counter() - start, "exceptions": len(at.exception)}))
+'''
+
+_LOAD_SNIPPET = '''
+import json, sys, time
+start = time.perf_counter()
+from inference import load_serving_assets
+model, scaler = load_serving_assets(sys.argv[1], sys.argv[2], sys.argv[3])
+print(json.dumps({"seconds": time.perf_counter() - start}))
+'''
+
+
+def _run_snippet(snippet, *args):
+    here = os.path.dirname(os.path.abspath(__file__))
+    out = subprocess.run([sys.executable, '-W', 'ignore', '-c', snippet, *args], cwd=here,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure_startup(repeats=3):
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'student.py')
+    runs = [_run_snippet(_STARTUP_SNIPPET, script) for _ in range(repeats)]
+    if any(r['exceptions'] for r in runs):
+        raise RuntimeError("student.py raised during the startup benchmark")
+    return float(np.median([r['seconds'] for r in runs]))
+
+
+def measure_load_assets(model_path, scaler_path, folded_path, repeats=3):
+    runs = [_run_snippet(_LOAD_SNIPPET, model_path, scaler_path, folded_path)['seconds'] for _ in range(repeats)]
+    return float(np.median(runs))
+
+
+def measure_single_row(model, scaler, profiles, repeats=2000):
+    from features import encode_profile
+    from scoring import predict_row
+
+    for profile in profiles[:50]:
+        predict_row(model, scaler, encode_profile(profile))
+
+    times = np.empty(repeats)
+    for i in range(repeats):
+        profile = profiles[i % len(profiles)]
+        start = time.perf_counter()
+        predict_row(model, scaler, encode_profile(profile))
+        times[i] = time.perf_counter() - start
+    p50, p95, p99 = np.percentile(times * 1000, [50, 95, 99])
+    return {'p50': round(p50, 4), 'p95': round(p95, 4), 'p99': round(p99, 4)}
+
+
+def measure_batches(model, scaler, features, sizes=BATCH_SIZES, min_seconds=0.5):
+    from scoring import predict_scores
+
+    results = {}
+    for size in sizes:
+        batch = features.iloc[np.arange(size) % len(features)].reset_index(drop=True)
+        predict_scores(model, scaler, batch)
+        calls = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < min_seconds or calls < 3:
+            predict_scores(model, scaler, batch)
+            calls += 1
+        elapsed = time.perf_counter() - start
+        results[str(size)] = {
+            'ms_per_batch': round(elapsed / calls * 1000, 4),
+            'rows_per_sec': round(size * calls / elapsed),
+        }
+    return results
+
+
+def peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+def check_thresholds(metrics, thresholds):
+    checks = []
+    for name, limit in thresholds.items():
+        value = metrics.get(name)
+        if value is None:
+            continue
+        ok = True
+        if 'max' in limit and value > limit['max']:
+            ok = False
+        if 'min' in limit and value < limit['min']:
+            ok = False
+        checks.append({'metric': name, 'value': value, **limit, 'passed': ok})
+    return checks
+
+
+def run(model_path=MODEL_PATH, scaler_path=SCALER_PATH, data_path=DATA_PATH, skip_startup=False,
+        folded_path=FOLDED_MODEL_PATH):
+    from dataset import read_dataset
+    from features import FEATURE_COLUMNS, encode_frame
+    from inference import load_serving_assets
+
+    df = read_dataset(data_path, FEATURE_COLUMNS, rows=5000)
+    model, scaler = load_serving_assets(model_path, scaler_path, folded_path)
+
+    single = measure_single_row(model, scaler, df[FEATURE_COLUMNS].to_dict('records'))
+    batches = measure_batches(model, scaler, encode_frame(df))
+
+    metrics = {
+        'startup_s': None if skip_startup else round(measure_startup(), 4),
+        'load_assets_s': round(measure_load_assets(model_path, scaler_path, folded_path), 4),
+        'single_row_p50_ms': single['p50'],
+        'single_row_p95_ms': single['p95'],
+        'single_row_p99_ms': single['p99'],
+        **{f'batch_rows_per_sec_{size}': b['rows_per_sec'] for size, b in batches.items()},
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+    thresholds = {}
+    if os.path.exists(THRESHOLDS_PATH):
+        with open(THRESHOLDS_PATH) as f:
+            thresholds = json.load(f)
+    checks = check_thresholds(metrics, thresholds)
+
+    return {
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'model_path': model_path,
+        'model_bytes': os.path.getsize(model_path),
+        'scaler_folded': scaler is None,
+        'metrics': metrics,
+        'batch': batches,
+        'checks': checks,
+        'passed': all(c['passed'] for c in checks),
+    }
+
+
+def load_results(path=RESULTS_PATH):
+    # Last recorded run, or None; used by the System page
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark app startup, asset loading and the prediction hot path.")
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--scaler', default=SCALER_PATH)
+    parser.add_argument('--folded', default=FOLDED_MODEL_PATH)
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--out', default=RESULTS_PATH)
+    parser.add_argument('--skip-startup', action='store_true', help="Skip the Streamlit startup measurement")
+    args = parser.parse_args(argv)
+
+    results = run(args.model, args.scaler, args.data, args.skip_startup, args.folded)
+    with open(args.out, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    for name, value in results['metrics'].items():
+        print(f"{name:<30} {value}")
+    failed = [c for c in results['checks'] if not c['passed']]
+    for c in failed:
+        bound = f"max {c['max']}" if 'max' in c and c['value'] > c['max'] else f"min {c['min']}"
+        print(f"REGRESSION: {c['metric']} = {c['value']} ({bound})", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# =============================
+# TIERED PREDICTION CACHE
+# =============================
+# Tier 1: in-process LRU keyed on (fingerprint, encoded 11-value input).
+# Tier 2 (optional): SQLite file shared by every app process/replica that
+# points at the same path. Entries are namespaced by the artifact
+# fingerprint, so a new model or scaler never sees stale scores, and
+# replicas (or an app mid hot-reload) on different artifacts can share the
+# file without evicting each other. Old entries age out of the LRU on their
+# own and are pruned from disk after DISK_MAX_AGE.
+DEFAULT_MAXSIZE = 4096
+DISK_MAX_AGE = 7 * 24 * 3600
+# Writes between disk prunes
+PRUNE_EVERY = 1000
+
+
+class PredictionCache:
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, disk_path=None):
+        self.maxsize = maxsize
+        self.disk_path = disk_path
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes = 0
+
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, timeout=5, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "fingerprint TEXT NOT NULL, key TEXT NOT NULL, score REAL NOT NULL, "
+                "ts REAL NOT NULL DEFAULT 0, PRIMARY KEY (fingerprint, key))"
+            )
+            columns = [row[1] for row in self._db.execute("PRAGMA table_info(predictions)")]
+            if 'ts' not in columns:
+                # Files from before pruning; their rows count as oldest
+                self._db.execute("ALTER TABLE predictions ADD COLUMN ts REAL NOT NULL DEFAULT 0")
+            self._prune()
+
+    def _prune(self):
+        try:
+            self._db.execute("DELETE FROM predictions WHERE ts < ?", (time.time() - DISK_MAX_AGE,))
+        except sqlite3.Error:
+            pass
+
+    def get_or_compute(self, key, fingerprint, compute):
+        with self._lock:
+            entry = (fingerprint, key)
+            if entry in self._memory:
+                self._memory.move_to_end(entry)
+                self.memory_hits += 1
+                return self._memory[entry]
+
+            score = self._disk_get(fingerprint, key)
+            if score is not None:
+                self.disk_hits += 1
+                self._store(entry, score)
+                return score
+
+        score = compute()
+
+        with self._lock:
+            self.misses += 1
+            self._store(entry, score)
+            self._disk_put(fingerprint, key, score)
+        return score
+
+    def _store(self, entry, score):
+        self._memory[entry] = score
+        self._memory.move_to_end(entry)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_key(self, key):
+        return ','.join(repr(float(v)) for v in key)
+
+    def _disk_get(self, fingerprint, key):
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT score FROM predictions WHERE fingerprint = ? AND key = ?",
+                (fingerprint, self._disk_key(key))
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def _disk_put(self, fingerprint, key, score):
+        if self._db is None:
+            return
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO predictions (fingerprint, key, score, ts) VALUES (?, ?, ?, ?)",
+                (fingerprint, self._disk_key(key), float(score), time.time())
+            )
+        except sqlite3.Error:
+            # The shared tier is best-effort; a locked or missing file only costs a miss
+            return
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            self._prune()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            'size': len(self._memory),
+            'maxsize': self.maxsize,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            'disk_tier': self.disk_path,
+        }
@@ -0,0 +1,255 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from artifacts import DATA_PATH, cache_path, file_digest
+from features import MAPPINGS
+
+# =============================
+# COLUMNAR DATASET STORE
+# =============================
+# The CSV is converted once into one .npy file per column plus a
+# dataset.json holding the row count, dtypes and category lists:
+#   categoricals  int8 codes, categories in schema code order (codes match
+#                 feature_schema.json; unseen values are appended)
+#   other text    dictionary-encoded: sorted categories, smallest int codes
+#   integers      the smallest int type that holds the column (age -> int8)
+#   floats        float32
+# Conversion streams the CSV twice in CHUNKSIZE-row chunks and never holds
+# the whole table.
+# Columns are opened with mmap_mode='r', so a reader pays only for the
+# columns (and rows) it touches. The store lives under the cache dir, keyed
+# on the CSV content hash, and is rebuilt the first time a changed CSV is
+# read.
+META_FILE = 'dataset.json'
+CHUNKSIZE = 100_000
+
+
+def store_dir(path=DATA_PATH):
+    return cache_path(f"dataset_{file_digest(path)}")
+
+
+def _int_dtype(lo, hi):
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if lo >= info.min and hi <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _scan(path, chunksize):
+    # First pass: row count and, per column, its kind (int < float < text),
+    # value range and the complete set of text values
+    rows = 0
+    kinds, lows, highs, seen = {}, {}, {}, {}
+    numeric = set()
+    rank = {'int': 0, 'float': 1, 'text': 2}
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        rows += len(chunk)
+        for col in chunk.columns:
+            values = chunk[col]
+            is_number = values.dtype.kind in 'biuf'
+            if is_number:
+                numeric.add(col)
+                if values.notna().any():
+                    lows[col] = min(lows.get(col, values.min()), values.min())
+                    highs[col] = max(highs.get(col, values.max()), values.max())
+            else:
+                seen.setdefault(col, set()).update(values.dropna().astype(str))
+            if col in MAPPINGS or not is_number:
+                kind = 'text'
+            else:
+                kind = 'int' if values.dtype.kind in 'biu' else 'float'
+            if rank[kind] > rank[kinds.get(col, 'int')]:
+                kinds[col] = kind
+            kinds.setdefault(col, kind)
+
+    # A text column some chunks parsed as numbers: those chunks' values were
+    # never recorded, so read the column again as text
+    mixed = [col for col in numeric if kinds[col] == 'text']
+    if mixed:
+        for chunk in pd.read_csv(path, chunksize=chunksize, usecols=mixed, dtype=str):
+            for col in mixed:
+                seen.setdefault(col, set()).update(chunk[col].dropna())
+    return rows, kinds, lows, highs, seen
+
+
+def convert(path=DATA_PATH, out_dir=None, chunksize=CHUNKSIZE):
+    # Streaming passes over the CSV, so memory stays at one chunk plus the
+    # category lists: _scan fixes every column's dtype and row count once
+    # the category sets are complete, then each chunk is written into its
+    # slice of preallocated .npy files
+    out_dir = out_dir or store_dir(path)
+    header = list(pd.read_csv(path, nrows=0).columns)
+    rows, kinds, lows, highs, seen = _scan(path, chunksize)
+    tmp = f"{out_dir}.{os.getpid()}.tmp"
+    os.makedirs(tmp, exist_ok=True)
+
+    columns, dtypes, categories = {}, {}, {}
+    for col in header:
+        kind = kinds.get(col, 'float')
+        if kind == 'text':
+            if col in MAPPINGS:
+                base = sorted(MAPPINGS[col], key=MAPPINGS[col].get)
+                categories[col] = base + sorted(seen.get(col, set()) - set(base))
+                if len(categories[col]) > np.iinfo(np.int8).max:
+                    raise ValueError(f"{col} has {len(categories[col])} categories, more than int8 codes hold")
+                dtypes[col] = np.dtype(np.int8)
+            else:
+                # Any other text column is dictionary-encoded the same way
+                categories[col] = sorted(seen.get(col, set()))
+                dtypes[col] = _int_dtype(-1, len(categories[col]))
+        elif kind == 'int':
+            dtypes[col] = _int_dtype(lows.get(col, 0), highs.get(col, 0))
+        else:
+            dtypes[col] = np.dtype(np.float32)
+
+    arrays = {col: np.lib.format.open_memmap(os.path.join(tmp, f"{col}.npy"), mode='w+',
+                                             dtype=dtypes[col], shape=(rows,))
+              for col in header}
+    lookups = {col: pd.Index(cats) for col, cats in categories.items()}
+    start = 0
+    for chunk in pd.read_csv(path, chunksize=chunksize, dtype={col: str for col in categories}):
+        stop = start + len(chunk)
+        for col in header:
+            if col in categories:
+                arrays[col][start:stop] = lookups[col].get_indexer(chunk[col])
+            else:
+                arrays[col][start:stop] = chunk[col].to_numpy()
+        start = stop
+    for col in header:
+        arrays[col].flush()
+        columns[col] = {'dtype': dtypes[col].name}
+        if col in categories:
+            columns[col]['categories'] = categories[col]
+    del arrays
+
+    with open(os.path.join(tmp, META_FILE), 'w') as f:
+        json.dump({'source': os.path.basename(path), 'rows': rows, 'columns': columns}, f, indent=2)
+    # The directory name carries the CSV digest, so a published store is
+    # never replaced: another process may be reading it. If one appeared
+    # meanwhile it holds the same data and the new copy is dropped
+    try:
+        os.replace(tmp, out_dir)
+    except OSError:
+        if not os.path.exists(os.path.join(out_dir, META_FILE)):
+            raise
+        shutil.rmtree(tmp, ignore_errors=True)
+    return out_dir
+
+
+def open_store(path=DATA_PATH):
+    # (meta, directory); converts the CSV on first use
+    directory = store_dir(path)
+    meta_path = os.path.join(directory, META_FILE)
+    if not os.path.exists(meta_path):
+        convert(path, directory)
+    with open(meta_path) as f:
+        return json.load(f), directory
+
+
+def load_columns(path=DATA_PATH, columns=None):
+    # {column: read-only memmap}; categoricals stay as their int8 codes
+    meta, directory = open_store(path)
+    columns = list(meta['columns']) if columns is None else list(columns)
+    missing = [col for col in columns if col not in meta['columns']]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    return {col: np.load(os.path.join(directory, f"{col}.npy"), mmap_mode='r') for col in columns}
+
+
+def read_dataset(path=DATA_PATH, columns=None, rows=None):
+    # DataFrame of the requested columns (all by default), optionally just
+    # the first `rows`; only those slices are read off disk
+    meta, _ = open_store(path)
+    arrays = load_columns(path, columns)
+    data = {}
+    for col, values in arrays.items():
+        values = np.asarray(values[:rows] if rows is not None else values)
+        categories = meta['columns'][col].get('categories')
+        if categories is not None:
+            data[col] = pd.Categorical.from_codes(values, categories=categories)
+        else:
+            data[col] = values
+    return pd.DataFrame(data, columns=list(arrays))
+
+
+def iter_chunks(path=DATA_PATH, columns=None, chunksize=CHUNKSIZE):
+    # Same chunk boundaries as pd.read_csv(path, chunksize=chunksize)
+    meta, _ = open_store(path)
+    arrays = load_columns(path, columns)
+    for start in range(0, meta['rows'], chunksize):
+        data = {}
+        for col, values in arrays.items():
+            block = np.asarray(values[start:start + chunksize])
+            categories = meta['columns'][col].get('categories')
+            data[col] = pd.Categorical.from_codes(block, categories=categories) if categories is not None else block
+        yield pd.DataFrame(data, columns=list(arrays), index=pd.RangeIndex(start, start + len(block)))
+
+
+_MEASURE_SNIPPET = '''
+import json, sys, time
+def rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * 4096 / 1e6
+import numpy as np, pandas as pd
+import dataset
+mode, path, columns = sys.argv[1], sys.argv[2], json.loads(sys.argv[3])
+before = rss_mb()
+start = time.perf_counter()
+if mode == 'csv':
+    df = pd.read_csv(path, usecols=columns)
+else:
+    df = dataset.read_dataset(path, columns)
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "rss_mb": rss_mb() - before,
+                  "frame_mb": df.memory_usage(deep=True).sum() / 1e6, "rows": len(df)}))
+'''
+
+
+def measure(mode, path=DATA_PATH, columns=None, repeats=3):
+    # Median load time and resident-memory growth, each run in a fresh process
+    here = os.path.dirname(os.path.abspath(__file__))
+    runs = []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, '-W', 'ignore', '-c', _MEASURE_SNIPPET, mode, path, json.dumps(columns)],
+                             cwd=here, capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {key: float(np.median([r[key] for r in runs])) for key in runs[0]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert the dataset CSV to the columnar store and compare load cost.")
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--columns', nargs='+', default=['study_hours', 'exam_score'],
+                        help="Projection to compare alongside the full table")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    directory = convert(args.data)
+    meta, _ = open_store(args.data)
+    csv_bytes = os.path.getsize(args.data)
+    store_bytes = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory))
+    print(f"{meta['rows']:,} rows -> {directory} in {time.perf_counter() - start:.2f}s "
+          f"({csv_bytes / 1e6:.2f} MB CSV, {store_bytes / 1e6:.2f} MB columnar)", file=sys.stderr)
+
+    print(f"{'load':<34}{'seconds':>9}{'RSS MB':>9}{'frame MB':>10}")
+    for label, mode, columns in (
+        ("CSV, all columns", 'csv', None),
+        ("columnar, all columns", 'store', None),
+        (f"CSV, {' + '.join(args.columns)}", 'csv', args.columns),
+        (f"columnar, {' + '.join(args.columns)}", 'store', args.columns),
+    ):
+        m = measure(mode, args.data, columns)
+        print(f"{label:<34}{m['seconds']:>9.4f}{m['rss_mb']:>9.1f}{m['frame_mb']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+import argparse
+import bisect
+import json
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+from artifacts import DATA_PATH, cache_path, file_digest
+from dataset import read_dataset
+from features import FEATURE_COLUMNS, FEATURE_LABELS, MAPPINGS
+
+# =============================
+# INPUT DRIFT MONITOR
+# =============================
+# Reference histograms for all 11 features come from the training CSV:
+# decile bins for the numeric columns, one bin per category for the rest.
+# Served profiles go into histograms with the same bins, one bin increment
+# per feature, so memory stays the same however long the app runs. Older
+# traffic fades out with a half-life measured in predictions. PSI and KS
+# are read straight off the two histograms, never by replaying a log.
+REFERENCE_QUANTILES = np.linspace(0.1, 0.9, 9)
+HALF_LIFE = 1000
+MIN_SAMPLES = 50
+# Usual PSI reading: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 major shift
+PSI_THRESHOLDS = (0.1, 0.25)
+_EPSILON = 1e-4
+# Served weights grow by 1/decay per update; rescale before they overflow
+_RESCALE_AT = 1e12
+
+
+def build_reference(df):
+    reference = {}
+    for col in FEATURE_COLUMNS:
+        if col in MAPPINGS:
+            categories = sorted(MAPPINGS[col], key=MAPPINGS[col].get)
+            counts = df[col].value_counts().reindex(categories, fill_value=0)
+            reference[col] = {'kind': 'categorical', 'categories': categories,
+                              'counts': counts.astype(int).tolist()}
+        else:
+            values = df[col].to_numpy(dtype=np.float64)
+            edges = np.unique(np.quantile(values, REFERENCE_QUANTILES))
+            counts = np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+            reference[col] = {'kind': 'numeric', 'edges': edges.tolist(), 'counts': counts.tolist()}
+    return reference
+
+
+def load_reference(path=DATA_PATH):
+    # Persisted per CSV content hash, like the analytics cube
+    target = cache_path(f"drift_reference_{file_digest(path)}.json")
+    if os.path.exists(target):
+        with open(target) as f:
+            return json.load(f)
+
+    reference = build_reference(read_dataset(path, FEATURE_COLUMNS))
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(reference, f)
+    os.replace(tmp, target)
+    return reference
+
+
+def psi(expected, actual):
+    p = np.asarray(expected, dtype=np.float64)
+    q = np.asarray(actual, dtype=np.float64)
+    p = np.maximum(p / p.sum(), _EPSILON)
+    q = np.maximum(q / q.sum(), _EPSILON)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def ks(expected, actual):
+    # Largest CDF gap over the shared bin edges (the binned KS statistic)
+    p = np.cumsum(expected) / np.sum(expected)
+    q = np.cumsum(actual) / np.sum(actual)
+    return float(np.max(np.abs(q - p)))
+
+
+def drift_status(value):
+    if value is None:
+        return 'collecting'
+    if value < PSI_THRESHOLDS[0]:
+        return 'stable'
+    if value < PSI_THRESHOLDS[1]:
+        return 'moderate'
+    return 'major'
+
+
+class DriftMonitor:
+    def __init__(self, reference, half_life=HALF_LIFE, min_samples=MIN_SAMPLES):
+        self.reference = reference
+        self.half_life = half_life
+        self.min_samples = min_samples
+        self._decay = 0.5 ** (1.0 / half_life) if half_life else 1.0
+        self._lock = threading.Lock()
+        self._lookups = {}
+        for col, ref in reference.items():
+            if ref['kind'] == 'categorical':
+                self._lookups[col] = {c: i for i, c in enumerate(ref['categories'])}
+            else:
+                self._lookups[col] = ref['edges']
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counts = {col: [0.0] * len(ref['counts']) for col, ref in self.reference.items()}
+            # Newer updates get a larger weight instead of decaying every
+            # stored count, so an update touches one bin per feature
+            self._weight = 1.0
+            self._total = 0.0
+            self.observed = 0
+            self.skipped = 0
+
+    def _bin(self, col, value):
+        lookup = self._lookups[col]
+        if isinstance(lookup, dict):
+            return lookup.get(value)
+        try:
+            return bisect.bisect_right(lookup, float(value))
+        except (TypeError, ValueError):
+            return None
+
+    def update(self, profile):
+        with self._lock:
+            for col in self._counts:
+                i = self._bin(col, profile.get(col))
+                if i is None:
+                    self.skipped += 1
+                else:
+                    self._counts[col][i] += self._weight
+            self._total += self._weight
+            self.observed += 1
+            self._advance(1)
+
+    def update_frame(self, df):
+        # A batch (bulk CSV) counts as len(df) updates sharing one weight
+        if df.empty:
+            return
+        with self._lock:
+            for col, ref in self.reference.items():
+                if ref['kind'] == 'categorical':
+                    bins = df[col].map(self._lookups[col]).dropna().astype(int).to_numpy()
+                    self.skipped += len(df) - len(bins)
+                else:
+                    bins = np.searchsorted(ref['edges'], df[col].to_numpy(dtype=np.float64), side='right')
+                counts = self._counts[col]
+                for i, n in enumerate(np.bincount(bins, minlength=len(counts))):
+                    counts[i] += n * self._weight
+            self._total += len(df) * self._weight
+            self.observed += len(df)
+            self._advance(len(df))
+
+    def _advance(self, steps):
+        if self._decay == 1.0:
+            return
+        self._weight /= self._decay ** steps
+        if self._weight > _RESCALE_AT:
+            scale = 1.0 / self._weight
+            for counts in self._counts.values():
+                for i in range(len(counts)):
+                    counts[i] *= scale
+            self._total *= scale
+            self._weight = 1.0
+
+    def effective_samples(self):
+        # Decayed sample size: how many recent predictions the histograms reflect
+        with self._lock:
+            return self._total / self._weight if self._weight else 0.0
+
+    def scores(self):
+        # {feature: {psi, ks, status, bins}}; psi/ks are None until min_samples
+        with self._lock:
+            counts = {col: list(c) for col, c in self._counts.items()}
+            total = self._total / self._weight
+        ready = total >= self.min_samples
+        result = {}
+        for col, ref in self.reference.items():
+            served = counts[col]
+            value = psi(ref['counts'], served) if ready and sum(served) > 0 else None
+            result[col] = {
+                'psi': value,
+                'ks': ks(ref['counts'], served) if value is not None and ref['kind'] == 'numeric' else None,
+                'status': drift_status(value),
+                'bins': len(ref['counts']),
+            }
+        return result
+
+
+def load_monitor(path=DATA_PATH, half_life=HALF_LIFE):
+    return DriftMonitor(load_reference(path), half_life)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score the drift of a CSV of student profiles against the training data.")
+    parser.add_argument('input', help="CSV with the 11 feature columns")
+    parser.add_argument('--data', default=DATA_PATH, help="Reference (training) CSV")
+    args = parser.parse_args(argv)
+
+    # No decay: every row of the file counts the same
+    monitor = DriftMonitor(load_reference(args.data), half_life=None, min_samples=1)
+    for chunk in pd.read_csv(args.input, usecols=FEATURE_COLUMNS, chunksize=50_000):
+        monitor.update_frame(chunk)
+    print(f"{monitor.observed:,} rows vs {args.data}", file=sys.stderr)
+
+    print(f"{'feature':<22}{'PSI':>8}{'KS':>8}  status")
+    for col, s in sorted(monitor.scores().items(), key=lambda kv: -(kv[1]['psi'] or 0)):
+        ks_text = f"{s['ks']:>8.3f}" if s['ks'] is not None else f"{'-':>8}"
+        psi_text = f"{s['psi']:>8.3f}" if s['psi'] is not None else f"{'-':>8}"
+        print(f"{FEATURE_LABELS[col]:<22}{psi_text}{ks_text}  {s['status']}")
+    if monitor.skipped:
+        print(f"{monitor.skipped:,} values outside the reference categories were skipped", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,351 @@
+import os
+
+# Parallelism comes from the process pool; each worker gets its own share of
+# the cores (see _init_worker). Must run before numpy/TensorFlow load, and
+# only as a script: the app imports this module for its paths and readers.
+if __name__ == '__main__':
+    for _var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ.setdefault(_var, '1')
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+import argparse
+import hashlib
+import itertools
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from artifacts import DATA_PATH, MODEL_PATH, SCALER_PATH, artifact_fingerprint, cache_path, file_digest
+from dataset import read_dataset
+from features import FEATURE_COLUMNS, encode_frame
+
+# =============================
+# K-FOLD EVALUATION & HYPERPARAMETER SEARCH
+# =============================
+# Every (config, fold) pair is one trial, run in a process pool. Finished
+# trials are written to .cache/trials/<key>.json as they complete, keyed on
+# the CSV hash + config + fold layout, so an interrupted search picks up
+# where it stopped and repeated configs are never retrained.
+#
+#   evaluate.py card     k-fold CV of the deployed model's own config plus
+#                        its metrics on the notebook holdout -> model_card.json
+#   evaluate.py search   grid over widths / dropout / batch size / patience
+#                        -> search_results.json, best config first
+MODEL_CARD_PATH = os.environ.get('EXAM_MODEL_CARD', 'model_card.json')
+SEARCH_RESULTS_PATH = os.environ.get('EXAM_SEARCH_RESULTS', 'search_results.json')
+TARGET = 'exam_score'
+VALIDATION_SPLIT = 0.3
+METRICS = ('mae', 'rmse', 'r2')
+
+SEARCH_SPACE = {
+    'hidden': [(64, 32), (128, 64), (32, 16)],
+    'dropout': [0.0, 0.2],
+    'batch_size': [32, 256],
+    'patience': [0, 5],
+}
+
+# How the deployed exam_model.h5 was trained in Exam_Score.ipynb; widths and
+# dropout are read back from the .h5 itself
+NOTEBOOK_TRAINING = {'batch_size': 32, 'patience': 0, 'epochs': 100}
+
+
+def grid(space=SEARCH_SPACE):
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def config_label(config):
+    hidden = '-'.join(str(u) for u in config['hidden'])
+    return f"11-{hidden}-1 drop {config['dropout']} batch {config['batch_size']} patience {config['patience']}"
+
+
+def fold_indices(n, k, seed):
+    order = np.random.default_rng(seed).permutation(n)
+    return np.array_split(order, k)
+
+
+def trial_key(data_digest, config, fold, k, seed, epochs):
+    spec = {'data': data_digest, 'config': config, 'fold': fold, 'k': k, 'seed': seed, 'epochs': epochs}
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:16]
+
+
+# Per-worker state: the encoded dataset is read once per process
+_data = {}
+
+
+def _init_worker(threads):
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def _load_data(data_path):
+    if data_path not in _data:
+        df = read_dataset(data_path, FEATURE_COLUMNS + [TARGET])
+        _data[data_path] = (encode_frame(df).to_numpy(dtype=np.float32), df[TARGET].to_numpy(dtype=np.float32))
+    return _data[data_path]
+
+
+def run_trial(data_path, config, fold, k, seed, epochs):
+    import tensorflow as tf
+
+    from train import build_model, regression_metrics
+
+    x, y = _load_data(data_path)
+    folds = fold_indices(len(x), k, seed)
+    test_idx = folds[fold]
+    train_idx = np.concatenate([f for i, f in enumerate(folds) if i != fold])
+    # Last 30% of the training rows validate early stopping, like validation_split
+    n_val = int(len(train_idx) * VALIDATION_SPLIT)
+    fit_idx, val_idx = train_idx[:-n_val], train_idx[-n_val:]
+
+    mean = x[fit_idx].mean(axis=0)
+    scale = x[fit_idx].std(axis=0)
+    scale[scale == 0] = 1.0
+
+    def scaled(idx):
+        return (x[idx] - mean) / scale
+
+    tf.keras.utils.set_random_seed(seed + fold)
+    model = build_model(tuple(config['hidden']), config['dropout'])
+    early = tf.keras.callbacks.EarlyStopping(monitor='val_loss', patience=config['patience'], restore_best_weights=True)
+
+    start = time.perf_counter()
+    history = model.fit(scaled(fit_idx), y[fit_idx], validation_data=(scaled(val_idx), y[val_idx]),
+                        epochs=epochs, batch_size=config['batch_size'], callbacks=[early], verbose=0)
+    fit_seconds = time.perf_counter() - start
+
+    pred = model.predict(scaled(test_idx), batch_size=8192, verbose=0)
+    return {
+        'config': config,
+        'fold': fold,
+        'metrics': regression_metrics(y[test_idx], pred),
+        'epochs_run': len(history.history['loss']),
+        'fit_seconds': round(fit_seconds, 3),
+        'rows': {'train': len(fit_idx), 'val': len(val_idx), 'test': len(test_idx)},
+    }
+
+
+def default_workers():
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def run_trials(configs, data_path=DATA_PATH, k=5, seed=42, epochs=100, workers=None, quiet=False):
+    # Returns one result per (config, fold); cached trials are read back
+    # instead of retrained, new ones are cached the moment they finish
+    workers = workers or default_workers()
+    trials_dir = cache_path('trials')
+    os.makedirs(trials_dir, exist_ok=True)
+    digest = file_digest(data_path)
+
+    results = []
+    pending = []
+    for config in configs:
+        config = {**config, 'hidden': list(config['hidden'])}
+        for fold in range(k):
+            path = os.path.join(trials_dir, f"{trial_key(digest, config, fold, k, seed, epochs)}.json")
+            if os.path.exists(path):
+                with open(path) as f:
+                    results.append(json.load(f))
+            else:
+                pending.append((path, config, fold))
+
+    if not quiet:
+        print(f"{len(results)} cached trials, {len(pending)} to run on {workers} workers", file=sys.stderr)
+    if not pending:
+        return results
+
+    threads = max(1, default_workers() // workers)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(threads,)) as pool:
+        futures = {pool.submit(run_trial, data_path, config, fold, k, seed, epochs): path
+                   for path, config, fold in pending}
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            path = futures[future]
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump(result, f, indent=2)
+            os.replace(tmp, path)
+            results.append(result)
+            if not quiet:
+                m = result['metrics']
+                print(f"[{done}/{len(pending)} {time.perf_counter() - start:.0f}s] {config_label(result['config'])} "
+                      f"fold {result['fold']}: MAE {m['mae']:.3f} R² {m['r2']:.4f}", file=sys.stderr)
+    return results
+
+
+def summarize(results):
+    # One row per config, best (lowest mean RMSE) first
+    groups = {}
+    for r in results:
+        groups.setdefault(json.dumps(r['config'], sort_keys=True), []).append(r)
+
+    rows = []
+    for key, trials in groups.items():
+        row = {'config': json.loads(key), 'folds': len(trials)}
+        for name in METRICS:
+            values = [t['metrics'][name] for t in trials]
+            row[name] = {'mean': float(np.mean(values)), 'std': float(np.std(values))}
+        row['epochs_run'] = float(np.mean([t['epochs_run'] for t in trials]))
+        row['fit_seconds'] = float(np.mean([t['fit_seconds'] for t in trials]))
+        rows.append(row)
+    return sorted(rows, key=lambda r: r['rmse']['mean'])
+
+
+def deployed_config(model_path=MODEL_PATH, training=NOTEBOOK_TRAINING):
+    # Architecture and training setup of the deployed .h5; `training` holds
+    # what the .h5 doesn't record (batch size, patience, max epochs)
+    import h5py
+
+    with h5py.File(model_path, 'r') as f:
+        model_config = json.loads(f.attrs['model_config'])
+        training_config = json.loads(f.attrs['training_config']) if 'training_config' in f.attrs else {}
+
+    layers = model_config['config']['layers']
+    units = [l['config']['units'] for l in layers if l['class_name'] == 'Dense']
+    dropout = [l['config']['rate'] for l in layers if l['class_name'] == 'Dropout']
+    optimizer = training_config.get('optimizer_config', {})
+    return {
+        'layers': [{'type': l['class_name'], 'units': l['config'].get('units'), 'rate': l['config'].get('rate'),
+                    'activation': l['config'].get('activation')}
+                   for l in layers if l['class_name'] in ('Dense', 'Dropout')],
+        'config': {'hidden': units[1:-1], 'dropout': dropout[0] if dropout else 0.0,
+                   'batch_size': training['batch_size'], 'patience': training['patience']},
+        'optimizer': optimizer.get('class_name'),
+        'learning_rate': round(optimizer.get('config', {}).get('learning_rate', 0), 6) or None,
+        'loss': training_config.get('loss'),
+    }
+
+
+def holdout_metrics(model_path=MODEL_PATH, scaler_path=SCALER_PATH, data_path=DATA_PATH, base_rows=None):
+    # Deployed model on the notebook's own 33% test split. base_rows and the
+    # digest of the held-out row indices pin the split for train.py --update
+    import joblib
+
+    from dataset import open_store
+    from export import holdout, rows_digest
+    from inference import NumpyModel
+    from train import holdout_split, regression_metrics
+
+    if base_rows is None:
+        base_rows = open_store(data_path)[0]['rows']
+    x_test, y_test = holdout(data_path, joblib.load(scaler_path), base_rows=base_rows)
+    model = NumpyModel.load(model_path)
+    return {'rows': len(y_test), 'base_rows': base_rows, 'rows_digest': rows_digest(holdout_split(base_rows)[1]),
+            **regression_metrics(y_test, model.predict(x_test))}
+
+
+def model_card(model_path=MODEL_PATH, scaler_path=SCALER_PATH, data_path=DATA_PATH, k=5, seed=42,
+               workers=None, cross_validate=True, quiet=False, training=NOTEBOOK_TRAINING, base_rows=None):
+    from inference import NumpyModel
+
+    deployed = deployed_config(model_path, training)
+    model = NumpyModel.load(model_path)
+    card = {
+        'fingerprint': artifact_fingerprint(model_path, scaler_path),
+        'data_digest': file_digest(data_path),
+        'measured_at': time.time(),
+        'architecture': deployed['layers'],
+        'parameters': int(sum(kernel.size + bias.size for kernel, bias, _ in model.layers)),
+        'optimizer': deployed['optimizer'],
+        'learning_rate': deployed['learning_rate'],
+        'loss': deployed['loss'],
+        'training': {**deployed['config'], 'max_epochs': training['epochs'],
+                     'test_size': 0.33, 'validation_split': VALIDATION_SPLIT},
+        'holdout': holdout_metrics(model_path, scaler_path, data_path, base_rows),
+        'cross_validation': None,
+    }
+    if cross_validate:
+        results = run_trials([deployed['config']], data_path, k, seed, training['epochs'], workers, quiet)
+        summary = summarize(results)[0]
+        card['cross_validation'] = {'k': k, 'seed': seed, **{name: summary[name] for name in METRICS},
+                                    'epochs_run': summary['epochs_run'], 'fit_seconds': summary['fit_seconds']}
+    return card
+
+
+def save_json(data, path):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def load_json(path):
+    # Used by the Dashboard and System pages; None if the file isn't there
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _parse_list(value, cast):
+    return [cast(v) for v in value.split(',') if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel k-fold evaluation and hyperparameter search.")
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('-k', '--folds', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all available cores)")
+    parser.add_argument('--quiet', action='store_true')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    card = sub.add_parser('card', help="Measure the deployed model and write model_card.json")
+    card.add_argument('--model', default=MODEL_PATH)
+    card.add_argument('--scaler', default=SCALER_PATH)
+    card.add_argument('--out', default=MODEL_CARD_PATH)
+    card.add_argument('--no-cv', action='store_true', help="Holdout metrics only")
+
+    search = sub.add_parser('search', help="Grid search, cached per trial")
+    search.add_argument('--hidden', default=';'.join(','.join(map(str, h)) for h in SEARCH_SPACE['hidden']),
+                        help="Semicolon-separated width lists, e.g. '64,32;128,64'")
+    search.add_argument('--dropout', default=','.join(map(str, SEARCH_SPACE['dropout'])))
+    search.add_argument('--batch-size', default=','.join(map(str, SEARCH_SPACE['batch_size'])))
+    search.add_argument('--patience', default=','.join(map(str, SEARCH_SPACE['patience'])))
+    search.add_argument('--epochs', type=int, default=100)
+    search.add_argument('--out', default=SEARCH_RESULTS_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == 'card':
+        # Keep the holdout pinned where the previous card put it
+        previous = (load_json(args.out) or {}).get('holdout') or {}
+        result = model_card(args.model, args.scaler, args.data, args.folds, args.seed, args.workers,
+                            not args.no_cv, args.quiet, base_rows=previous.get('base_rows'))
+        save_json(result, args.out)
+        h = result['holdout']
+        print(f"holdout ({h['rows']:,} rows): MAE {h['mae']:.3f}  RMSE {h['rmse']:.3f}  R² {h['r2']:.4f}")
+        cv = result['cross_validation']
+        if cv:
+            print(f"{cv['k']}-fold CV: MAE {cv['mae']['mean']:.3f} ± {cv['mae']['std']:.3f}  "
+                  f"RMSE {cv['rmse']['mean']:.3f} ± {cv['rmse']['std']:.3f}  R² {cv['r2']['mean']:.4f} ± {cv['r2']['std']:.4f}")
+        return
+
+    space = {
+        'hidden': [_parse_list(h, int) for h in args.hidden.split(';') if h],
+        'dropout': _parse_list(args.dropout, float),
+        'batch_size': _parse_list(args.batch_size, int),
+        'patience': _parse_list(args.patience, int),
+    }
+    start = time.perf_counter()
+    results = run_trials(grid(space), args.data, args.folds, args.seed, args.epochs, args.workers, args.quiet)
+    summary = summarize(results)
+    save_json({'k': args.folds, 'seed': args.seed, 'epochs': args.epochs, 'data_digest': file_digest(args.data),
+               'seconds': round(time.perf_counter() - start, 1), 'results': summary}, args.out)
+
+    print(f"{'config':<50}{'MAE':>16}{'RMSE':>16}{'R²':>18}{'epochs':>8}")
+    for row in summary:
+        print(f"{config_label(row['config']):<50}"
+              + ''.join(f"{row[m]['mean']:>9.3f} ±{row[m]['std']:>5.3f}" for m in ('mae', 'rmse'))
+              + f"{row['r2']['mean']:>10.4f} ±{row['r2']['std']:>6.4f}{row['epochs_run']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
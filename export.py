@@ -0,0 +1,130 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+
+from artifacts import DATA_PATH, MODEL_PATH, SCALER_PATH
+from dataset import read_dataset
+from features import FEATURE_COLUMNS, encode_frame
+from inference import NumpyModel
+from train import ARTIFACT_ROOT, holdout_split, regression_metrics
+
+# =============================
+# COMPACT MODEL EXPORT
+# =============================
+# Writes float16 and int8 versions of the model as .npz weight files (no
+# h5py needed to load them) and a report comparing accuracy, size, load
+# time and latency against the original .h5.
+FORMATS = ('float16', 'int8')
+BATCH_SIZES = (1, 1024, 16384)
+# Under the (git-ignored) artifact root, next to the versioned training runs
+EXPORT_DIR = os.path.join(ARTIFACT_ROOT, 'export')
+
+
+def rows_digest(indices):
+    # Order-independent: split_to_disk yields the held-out rows sorted
+    return hashlib.sha256(np.sort(np.asarray(indices, dtype=np.int64)).tobytes()).hexdigest()[:16]
+
+
+def holdout(data_path, scaler, seed=42, test_size=0.33, base_rows=None):
+    # Same split as Exam_Score.ipynb: train_test_split(test_size=0.33, random_state=42).
+    # base_rows pins it to the first rows of the CSV, so cohorts appended
+    # later don't reshuffle which rows are held out
+    df = read_dataset(data_path, FEATURE_COLUMNS + ['exam_score'])
+    base_rows = len(df) if base_rows is None else base_rows
+    if base_rows > len(df):
+        raise ValueError(f"{data_path} has {len(df):,} rows, fewer than the {base_rows:,} the holdout was pinned to")
+    _, test_idx = holdout_split(base_rows, seed, test_size)
+    df = df.iloc[test_idx]
+    return scaler.transform(encode_frame(df)).astype(np.float32), df['exam_score'].to_numpy()
+
+
+def _timed(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def profile_model(path, x_test, y_test):
+    load_times = _timed(lambda: NumpyModel.load(path), 5)
+    model = NumpyModel.load(path)
+    pred = model.predict(x_test)
+
+    latency = {}
+    for size in BATCH_SIZES:
+        batch = np.resize(x_test, (size, x_test.shape[1]))
+        times = _timed(lambda: model.predict(batch), 200 if size == 1 else 20)
+        latency[str(size)] = {
+            'p50_ms': round(float(np.percentile(times, 50)) * 1000, 4),
+            'p99_ms': round(float(np.percentile(times, 99)) * 1000, 4),
+            'rows_per_sec': round(size / float(np.median(times))),
+        }
+
+    metrics = regression_metrics(y_test, pred)
+    return {
+        'path': path,
+        'file_bytes': os.path.getsize(path),
+        'load_ms': round(float(np.median(load_times)) * 1000, 3),
+        'mae': round(metrics['mae'], 4),
+        'rmse': round(metrics['rmse'], 4),
+        'r2': round(metrics['r2'], 5),
+        'latency': latency,
+        'pred': pred,
+    }
+
+
+def export(model_path=MODEL_PATH, scaler_path=SCALER_PATH, data_path=DATA_PATH, out_dir=EXPORT_DIR, formats=FORMATS):
+    os.makedirs(out_dir, exist_ok=True)
+    base = NumpyModel.from_h5(model_path)
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    paths = {'original': model_path}
+    for fmt in formats:
+        paths[fmt] = os.path.join(out_dir, f"{stem}_{fmt}.npz")
+        base.save_npz(paths[fmt], fmt)
+
+    x_test, y_test = holdout(data_path, joblib.load(scaler_path))
+    results = {name: profile_model(path, x_test, y_test) for name, path in paths.items()}
+
+    reference = results['original'].pop('pred')
+    for name, result in results.items():
+        if name != 'original':
+            result['max_abs_diff_vs_original'] = round(float(np.max(np.abs(result.pop('pred') - reference))), 5)
+
+    report = {'holdout_rows': len(y_test), 'models': results}
+    with open(os.path.join(out_dir, f"{stem}_export_report.json"), 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def print_report(report):
+    print(f"{'model':<10}{'size':>10}{'load':>10}{'MAE':>9}{'RMSE':>9}{'1 row':>11}{'16k rows':>12}{'max diff':>10}")
+    for name, r in report['models'].items():
+        print(f"{name:<10}{r['file_bytes'] / 1024:>8.1f}KB{r['load_ms']:>8.2f}ms{r['mae']:>9.4f}{r['rmse']:>9.4f}"
+              f"{r['latency']['1']['p50_ms']:>9.4f}ms{r['latency']['16384']['p50_ms']:>10.3f}ms"
+              f"{r.get('max_abs_diff_vs_original', 0):>10.4f}")
+    print(f"holdout rows: {report['holdout_rows']:,}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export compact float16/int8 model files and an accuracy/latency report.")
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--scaler', default=SCALER_PATH)
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--out', default=EXPORT_DIR)
+    args = parser.parse_args(argv)
+
+    report = export(args.model, args.scaler, args.data, args.out)
+    print_report(report)
+    print("Serve a compact model with EXAM_MODEL_PATH=<file>.npz", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
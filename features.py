@@ -0,0 +1,124 @@
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from artifacts import SCHEMA_PATH
+
+# =============================
+# FEATURE ENCODING
+# =============================
+# The schema (column order + category codes) lives in feature_schema.json
+# next to the model, and is the only copy: training writes it into every
+# artifact set, `train.py --promote` deploys it with the model, and the app,
+# CLIs and training all encode through the FeatureEncoder built from it.
+# ENCODER below is the schema on disk at import; the app loads a fresh
+# encoder with every model version it hot-swaps in.
+# Codes match the LabelEncoder pass in Exam_Score.ipynb (alphabetical order
+# per column).
+
+
+class FeatureEncoder:
+    def __init__(self, feature_columns, mappings):
+        self.feature_columns = list(feature_columns)
+        self.mappings = {col: dict(mapping) for col, mapping in mappings.items()}
+        unknown = [col for col in self.mappings if col not in self.feature_columns]
+        if unknown:
+            raise ValueError(f"Mappings for columns outside the schema: {', '.join(unknown)}")
+        # Per-column lookup: category index -> code
+        self._lookups = {
+            col: (pd.Index(list(mapping)), np.fromiter(mapping.values(), dtype=np.int64, count=len(mapping)))
+            for col, mapping in self.mappings.items()
+        }
+
+    @classmethod
+    def load(cls, path=SCHEMA_PATH):
+        with open(path) as f:
+            schema = json.load(f)
+        return cls(schema['feature_columns'], schema['mappings'])
+
+    def schema(self):
+        return {'feature_columns': self.feature_columns, 'mappings': self.mappings}
+
+    def save(self, path):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.schema(), f, indent=2)
+        os.replace(tmp, path)
+
+    def encode_frame(self, df):
+        # Vectorized: each categorical column is factorized once (or its
+        # existing category codes reused) and the few distinct values are
+        # mapped through the lookup, instead of a dict lookup per row.
+        # Returns the schema columns only, in schema order.
+        missing = [col for col in self.feature_columns if col not in df.columns]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+        encoded = {}
+        for col in self.feature_columns:
+            values = df[col]
+            if col not in self._lookups:
+                encoded[col] = values.to_numpy()
+                continue
+            categories, codes = self._lookups[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                index, uniques = values.cat.codes.to_numpy(), values.cat.categories
+            else:
+                index, uniques = pd.factorize(values)
+            lookup = categories.get_indexer(uniques)
+            if (index < 0).any():
+                raise ValueError(f"Missing {col} values")
+            if (lookup < 0).any():
+                used = np.zeros(len(uniques), dtype=bool)
+                used[index] = True
+                unknown = sorted(str(u) for u in uniques[(lookup < 0) & used])
+                if unknown:
+                    raise ValueError(f"Unknown {col} values: {', '.join(unknown[:5])}")
+            encoded[col] = codes[lookup][index]
+        return pd.DataFrame(encoded, index=df.index, columns=self.feature_columns)
+
+    def encode_profile(self, profile):
+        # Single JSON/dict profile -> feature row, same encoding as encode_frame()
+        row = []
+        for col in self.feature_columns:
+            if col not in profile:
+                raise ValueError(f"Missing field: {col}")
+            value = profile[col]
+            mapping = self.mappings.get(col)
+            if mapping is not None:
+                if value not in mapping:
+                    raise ValueError(f"Unknown {col} value: {value}")
+                value = mapping[value]
+            value = float(value)
+            # NaN / Infinity would come back as a score JSON can't carry
+            if not math.isfinite(value):
+                raise ValueError(f"{col} must be a finite number, got {profile[col]}")
+            row.append(value)
+        return row
+
+
+ENCODER = FeatureEncoder.load()
+MAPPINGS = ENCODER.mappings
+# Column order the scaler and model were fitted on
+FEATURE_COLUMNS = ENCODER.feature_columns
+encode_frame = ENCODER.encode_frame
+encode_profile = ENCODER.encode_profile
+
+
+# Display names used across the UI
+FEATURE_LABELS = {
+    'age': 'Age',
+    'gender': 'Gender',
+    'course': 'Course Type',
+    'study_hours': 'Study Hours',
+    'class_attendance': 'Attendance',
+    'internet_access': 'Internet Access',
+    'sleep_hours': 'Sleep Hours',
+    'sleep_quality': 'Sleep Quality',
+    'study_method': 'Study Method',
+    'facility_rating': 'Facility Rating',
+    'exam_difficulty': 'Exam Difficulty',
+}
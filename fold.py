@@ -0,0 +1,75 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from artifacts import DATA_PATH, FOLDED_MODEL_PATH, MODEL_PATH, SCALER_PATH, artifact_fingerprint
+from dataset import read_dataset
+from features import FEATURE_COLUMNS, encode_frame
+from inference import NumpyModel
+
+# =============================
+# SCALER FOLDING
+# =============================
+# StandardScaler is (x - mean) / scale per column, and the first layer is
+# x @ W + b, so the two collapse into one layer:
+#   W' = W / scale[:, None]      b' = b - (mean / scale) @ W
+# The folded .npz takes raw encoded features, so serving needs neither
+# scaler.pkl nor scikit-learn. It records the fingerprint of the model and
+# scaler it came from; the app ignores it once either of those changes.
+VERIFY_ROWS = 20_000
+VERIFY_TOLERANCE = 1e-3
+
+
+def fold(model_path=MODEL_PATH, scaler_path=SCALER_PATH, out_path=FOLDED_MODEL_PATH):
+    import joblib
+
+    scaler = joblib.load(scaler_path)
+    model = NumpyModel.load(model_path).fold_scaler(
+        getattr(scaler, 'mean_', None), getattr(scaler, 'scale_', None),
+        artifact_fingerprint(model_path, scaler_path),
+    )
+    model.save_npz(out_path)
+    return model
+
+
+def verify(folded_path=FOLDED_MODEL_PATH, model_path=MODEL_PATH, scaler_path=SCALER_PATH,
+           data_path=DATA_PATH, rows=VERIFY_ROWS):
+    # Max absolute difference between folded and scaler + original model
+    import joblib
+
+    features = encode_frame(read_dataset(data_path, FEATURE_COLUMNS, rows=rows))
+    reference = NumpyModel.load(model_path).predict(joblib.load(scaler_path).transform(features))
+    folded = NumpyModel.load(folded_path).predict(features.to_numpy(dtype=np.float32))
+    return float(np.max(np.abs(folded - reference)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fold the StandardScaler into the model's first Dense layer.")
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--scaler', default=SCALER_PATH)
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--out', default=FOLDED_MODEL_PATH)
+    args = parser.parse_args(argv)
+
+    # Verified under a temp name (ending in .npz, or numpy appends one); the
+    # app only ever sees a folded model that passed
+    tmp = f"{args.out}.{os.getpid()}.tmp.npz"
+    try:
+        model = fold(args.model, args.scaler, tmp)
+        diff = verify(tmp, args.model, args.scaler, args.data)
+        if diff > VERIFY_TOLERANCE:
+            print(f"Not written: max abs diff vs scaler + model is {diff:.2e} (tolerance {VERIFY_TOLERANCE:.0e})",
+                  file=sys.stderr)
+            sys.exit(1)
+        os.replace(tmp, args.out)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    print(f"Wrote {args.out} (source {model.source_fingerprint}); max abs diff vs scaler + model: {diff:.2e}",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from artifacts import DATA_PATH, FOLDED_MODEL_PATH, MODEL_PATH, SCALER_PATH, artifact_fingerprint, cache_path, file_digest
+from dataset import read_dataset
+from features import FEATURE_COLUMNS, encode_frame
+from scoring import scale_features
+
+# =============================
+# PERMUTATION FEATURE IMPORTANCE
+# =============================
+# Importance of a feature = how much the MSE rises when that column is
+# shuffled. StandardScaler is per-column affine, so shuffling the scaled
+# matrix is the same as shuffling then scaling; every (feature, repeat)
+# copy is stacked into one array and scored in large batches.
+N_REPEATS = 5
+PREDICT_BATCH = 65536
+
+
+def permutation_importance(model, scaled, y, n_repeats=N_REPEATS, seed=0):
+    rng = np.random.default_rng(seed)
+    scaled = np.asarray(scaled, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float32)
+    n, n_features = scaled.shape
+
+    baseline = model.predict(scaled, batch_size=PREDICT_BATCH, verbose=0)[:, 0]
+    baseline_mse = float(np.mean((baseline - y) ** 2))
+
+    stacked = np.tile(scaled, (n_features * n_repeats, 1)).reshape(n_features, n_repeats, n, n_features)
+    for j in range(n_features):
+        for r in range(n_repeats):
+            stacked[j, r, :, j] = scaled[rng.permutation(n), j]
+
+    preds = model.predict(stacked.reshape(-1, n_features), batch_size=PREDICT_BATCH, verbose=0)[:, 0]
+    mse = ((preds.reshape(n_features, n_repeats, n) - y) ** 2).mean(axis=2)
+    increase = mse - baseline_mse
+
+    return {
+        'baseline_mse': baseline_mse,
+        'mean_increase': increase.mean(axis=1).tolist(),
+        'std_increase': increase.std(axis=1).tolist(),
+    }
+
+
+def _cache_file(model_path, scaler_path, data_path, n_repeats, seed):
+    key = f"{artifact_fingerprint(model_path, scaler_path)}_{file_digest(data_path)}_r{n_repeats}_s{seed}"
+    return cache_path(f"importance_{key}.json")
+
+
+def cached_importance(model_path=MODEL_PATH, scaler_path=SCALER_PATH, data_path=DATA_PATH,
+                      n_repeats=N_REPEATS, seed=0):
+    # Read-only lookup: None if the job hasn't run for these artifacts/data yet
+    path = _cache_file(model_path, scaler_path, data_path, n_repeats, seed)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def compute_importance(model_path=MODEL_PATH, scaler_path=SCALER_PATH, data_path=DATA_PATH,
+                       n_repeats=N_REPEATS, seed=0, model=None, scaler=None):
+    cached = cached_importance(model_path, scaler_path, data_path, n_repeats, seed)
+    if cached is not None:
+        return cached
+
+    if model is None:
+        from inference import load_serving_assets
+        model, scaler = load_serving_assets(model_path, scaler_path, FOLDED_MODEL_PATH)
+
+    start = time.perf_counter()
+    df = read_dataset(data_path, FEATURE_COLUMNS + ['exam_score'])
+    scaled = scale_features(scaler, encode_frame(df))
+    result = permutation_importance(model, scaled, df['exam_score'].to_numpy(), n_repeats, seed)
+
+    increases = np.clip(result['mean_increase'], 0, None)
+    total = increases.sum() or 1.0
+    result.update({
+        'features': FEATURE_COLUMNS,
+        'importance_pct': (100 * increases / total).round(2).tolist(),
+        'rows': len(df),
+        'n_repeats': n_repeats,
+        'seconds': round(time.perf_counter() - start, 3),
+    })
+
+    path = _cache_file(model_path, scaler_path, data_path, n_repeats, seed)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(result, f, indent=2)
+    os.replace(tmp, path)
+    return result
+
+
+if __name__ == '__main__':
+    result = compute_importance(n_repeats=int(sys.argv[1]) if len(sys.argv) > 1 else N_REPEATS)
+    ranked = sorted(zip(result['features'], result['importance_pct'], result['mean_increase']),
+                    key=lambda r: r[1], reverse=True)
+    for feature, pct, increase in ranked:
+        print(f"{feature:<18} {pct:6.2f}%   {increase:+.2f} MSE")
+    print(f"baseline MSE {result['baseline_mse']:.2f}, {result['rows']:,} rows x "
+          f"{result['n_repeats']} repeats in {result['seconds']}s")
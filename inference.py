@@ -0,0 +1,198 @@
+import json
+import os
+import sys
+
+import numpy as np
+
+# =============================
+# PURE-NUMPY INFERENCE ENGINE
+# =============================
+# Reads the Dense weights out of a Keras .h5 file once and runs the forward
+# pass as plain matrix multiplies. Dropout and InputLayer are no-ops at
+# inference time, so only Dense layers are kept.
+
+ACTIVATIONS = {
+    'relu': lambda x: np.maximum(x, 0, out=x),
+    'linear': lambda x: x,
+}
+
+
+class NumpyModel:
+    def __init__(self, layers, input_mean=None, input_scale=None, source_fingerprint=None):
+        # layers: list of (kernel, bias, activation) tuples
+        self.layers = layers
+        # Set when a StandardScaler has been folded into the first layer:
+        # the model then takes raw encoded features, not scaled ones
+        self.input_mean = input_mean
+        self.input_scale = input_scale
+        self.source_fingerprint = source_fingerprint
+
+    @classmethod
+    def load(cls, path):
+        if path.endswith('.npz'):
+            return cls.from_npz(path)
+        return cls.from_h5(path)
+
+    @classmethod
+    def from_h5(cls, path):
+        import h5py
+        with h5py.File(path, 'r') as f:
+            config = json.loads(f.attrs['model_config'])
+            weights = f['model_weights']
+            layers = []
+            for layer in config['config']['layers']:
+                kind = layer['class_name']
+                if kind in ('InputLayer', 'Dropout'):
+                    continue
+                if kind != 'Dense':
+                    raise ValueError(f"Unsupported layer type in {path}: {kind}")
+
+                name = layer['config']['name']
+                activation = layer['config'].get('activation', 'linear')
+                if activation not in ACTIVATIONS:
+                    raise ValueError(f"Unsupported activation in {path}: {activation}")
+
+                group = weights[name]
+                names = [n.decode() if isinstance(n, bytes) else n for n in group.attrs['weight_names']]
+                kernel = np.asarray(group[names[0]], dtype=np.float32)
+                if layer['config'].get('use_bias', True):
+                    bias = np.asarray(group[names[1]], dtype=np.float32)
+                else:
+                    bias = np.zeros(kernel.shape[1], dtype=np.float32)
+                layers.append((kernel, bias, activation))
+        return cls(layers)
+
+    @classmethod
+    def from_npz(cls, path):
+        # Compact export (see export.py): float32/float16 kernels, or int8
+        # kernels with a per-output-column scale. Dequantized once at load.
+        with np.load(path) as data:
+            layers = []
+            for i in range(int(data['n_layers'])):
+                kernel = data[f'kernel_{i}'].astype(np.float32)
+                if f'kernel_scale_{i}' in data:
+                    kernel *= data[f'kernel_scale_{i}'].astype(np.float32)
+                bias = data[f'bias_{i}'].astype(np.float32)
+                layers.append((kernel, bias, str(data[f'activation_{i}'])))
+            folded = {}
+            if 'input_mean' in data:
+                folded = {
+                    'input_mean': data['input_mean'].astype(np.float64),
+                    'input_scale': data['input_scale'].astype(np.float64),
+                    'source_fingerprint': str(data['source_fingerprint']),
+                }
+        return cls(layers, **folded)
+
+    def save_npz(self, path, dtype='float32'):
+        arrays = {'n_layers': np.array(len(self.layers)), 'format': np.array(dtype)}
+        for i, (kernel, bias, activation) in enumerate(self.layers):
+            if dtype == 'int8':
+                # Symmetric per-output-column quantization
+                scale = np.abs(kernel).max(axis=0) / 127.0
+                scale[scale == 0] = 1.0
+                arrays[f'kernel_{i}'] = np.round(kernel / scale).astype(np.int8)
+                arrays[f'kernel_scale_{i}'] = scale.astype(np.float32)
+                arrays[f'bias_{i}'] = bias.astype(np.float32)
+            else:
+                arrays[f'kernel_{i}'] = kernel.astype(dtype)
+                arrays[f'bias_{i}'] = bias.astype(dtype)
+            arrays[f'activation_{i}'] = np.array(activation)
+        if self.scaler_folded:
+            arrays['input_mean'] = self.input_mean
+            arrays['input_scale'] = self.input_scale
+            arrays['source_fingerprint'] = np.array(self.source_fingerprint or '')
+        np.savez_compressed(path, **arrays)
+
+    @property
+    def scaler_folded(self):
+        return self.input_mean is not None
+
+    def fold_scaler(self, mean, scale, source_fingerprint=None):
+        # (x - mean) / scale @ W + b  ==  x @ (W / scale[:, None]) + (b - (mean / scale) @ W)
+        mean = np.zeros(self.n_features) if mean is None else np.asarray(mean, dtype=np.float64)
+        scale = np.ones(self.n_features) if scale is None else np.asarray(scale, dtype=np.float64)
+        kernel, bias, activation = self.layers[0]
+        kernel64 = kernel.astype(np.float64)
+        folded_kernel = (kernel64 / scale[:, None]).astype(np.float32)
+        folded_bias = (bias.astype(np.float64) - (mean / scale) @ kernel64).astype(np.float32)
+        layers = [(folded_kernel, folded_bias, activation)] + list(self.layers[1:])
+        return NumpyModel(layers, mean, scale, source_fingerprint)
+
+    @property
+    def n_features(self):
+        return self.layers[0][0].shape[0]
+
+    def predict(self, x, batch_size=None, verbose=0):
+        # Same call shape as keras Model.predict: (n, 11) in, (n, 1) out
+        x = np.asarray(x, dtype=np.float32)
+        if batch_size is None or len(x) <= batch_size:
+            return self._forward(x)
+        return np.concatenate([self._forward(x[i:i + batch_size]) for i in range(0, len(x), batch_size)])
+
+    def _forward(self, h):
+        for kernel, bias, activation in self.layers:
+            h = h @ kernel
+            h += bias
+            h = ACTIVATIONS[activation](h)
+        return h
+
+
+def load_folded_model(path, fingerprint):
+    # The folded artifact, if it exists and was built from the current
+    # model + scaler; None means fall back to the .h5 + scaler.pkl pair
+    if fingerprint is None or not os.path.exists(path):
+        return None
+    model = NumpyModel.from_npz(path)
+    if not model.scaler_folded or model.source_fingerprint != fingerprint:
+        return None
+    return model
+
+
+def load_serving_assets(model_path, scaler_path, folded_path=None, fingerprint=None):
+    # (model, scaler); scaler is None when the folded model is usable, and
+    # joblib/sklearn are never imported in that case
+    if folded_path:
+        if fingerprint is None:
+            from artifacts import artifact_fingerprint
+            fingerprint = artifact_fingerprint(model_path, scaler_path)
+        model = load_folded_model(folded_path, fingerprint)
+        if model is not None:
+            return model, None
+    model = NumpyModel.load(model_path)
+    if model.scaler_folded:
+        return model, None
+    import joblib
+    return model, joblib.load(scaler_path)
+
+
+def load_keras_model(path):
+    # TensorFlow is only needed for the optional cross-check
+    import tensorflow as tf
+    return tf.keras.models.load_model(path, compile=False)
+
+
+def compare_with_keras(path, x):
+    # Max absolute difference between the NumPy and Keras outputs
+    numpy_out = NumpyModel.from_h5(path).predict(x)
+    keras_out = load_keras_model(path).predict(np.asarray(x, dtype=np.float32), verbose=0)
+    return float(np.max(np.abs(numpy_out - keras_out)))
+
+
+# =============================
+# CLI: CHECK AGAINST KERAS
+# =============================
+if __name__ == '__main__':
+    import joblib
+    import pandas as pd
+
+    from artifacts import DATA_PATH, MODEL_PATH, SCALER_PATH
+    from features import FEATURE_COLUMNS, encode_frame
+
+    model_path = sys.argv[1] if len(sys.argv) > 1 else MODEL_PATH
+    df = pd.read_csv(DATA_PATH, nrows=2000)
+    scaler = joblib.load(SCALER_PATH)
+    x = scaler.transform(encode_frame(df)[FEATURE_COLUMNS].to_numpy())
+
+    diff = compare_with_keras(model_path, x)
+    print(f"max |numpy - keras| over {len(x)} rows: {diff:.2e}")
+    sys.exit(0 if diff < 1e-3 else 1)
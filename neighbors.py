@@ -0,0 +1,119 @@
+import argparse
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+
+from artifacts import DATA_PATH, FOLDED_MODEL_PATH, MODEL_PATH, SCALER_PATH, artifact_fingerprint, cache_path, file_digest
+from dataset import read_dataset
+from features import encode_frame, encode_profile
+
+# =============================
+# SIMILAR STUDENTS INDEX
+# =============================
+# KD-tree over the scaled 11-feature vectors of every record in the dataset.
+# Built once and pickled to .cache keyed on the CSV + scaler content hashes,
+# so it is only rebuilt when the data (or the scaling) changes; loading it
+# back is a single unpickle. Queries take one profile or a whole batch.
+DEFAULT_K = 5
+
+
+class NeighborIndex:
+    def __init__(self, records, mean, scale, tree=None):
+        from scipy.spatial import cKDTree
+
+        self.records = records.reset_index(drop=True)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.tree = tree if tree is not None else cKDTree(self._scale(encode_frame(self.records)))
+
+    def _scale(self, features):
+        return (np.asarray(features, dtype=np.float64) - self.mean) / self.scale
+
+    def __len__(self):
+        return len(self.records)
+
+    def query(self, features, k=DEFAULT_K):
+        # features: encoded (n, 11) rows -> (distances, indices), each (n, k)
+        features = np.atleast_2d(np.asarray(features, dtype=np.float64))
+        k = min(k, len(self))
+        distances, indices = self.tree.query(self._scale(features), k=k, workers=-1 if len(features) > 1 else 1)
+        return distances.reshape(len(features), k), indices.reshape(len(features), k)
+
+    def similar(self, profile, k=DEFAULT_K):
+        # The k closest records to one profile, nearest first, with a distance column
+        distances, indices = self.query([encode_profile(profile)], k)
+        similar = self.records.iloc[indices[0]].copy()
+        similar['distance'] = distances[0]
+        return similar
+
+    def neighbor_scores(self, features, k=DEFAULT_K):
+        # Batched: mean actual exam_score of each row's k nearest records
+        _, indices = self.query(features, k)
+        return self.records['exam_score'].to_numpy()[indices].mean(axis=1)
+
+
+def _scaler_stats(scaler_path, model_path, folded_path):
+    # The folded model stores the scaler's mean and scale, so with a current
+    # one the index is built without unpickling scaler.pkl (scikit-learn)
+    from inference import load_folded_model
+
+    folded = load_folded_model(folded_path, artifact_fingerprint(model_path, scaler_path))
+    if folded is not None:
+        return folded.input_mean, folded.input_scale
+    import joblib
+
+    scaler = joblib.load(scaler_path)
+    return scaler.mean_, scaler.scale_
+
+
+def load_index(data_path=DATA_PATH, scaler_path=SCALER_PATH, model_path=MODEL_PATH, folded_path=FOLDED_MODEL_PATH):
+    target = cache_path(f"neighbors_{file_digest(data_path)}_{file_digest(scaler_path)}.pkl")
+    if os.path.exists(target):
+        with open(target, 'rb') as f:
+            return NeighborIndex(**pickle.load(f))
+
+    mean, scale = _scaler_stats(scaler_path, model_path, folded_path)
+    index = NeighborIndex(read_dataset(data_path), mean, scale)
+    # Plain components, not the class, so the pickle doesn't depend on the
+    # module it was built from
+    state = {'records': index.records, 'mean': index.mean, 'scale': index.scale, 'tree': index.tree}
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, target)
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the similar-students index and time single and batched queries.")
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--scaler', default=SCALER_PATH)
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--folded', default=FOLDED_MODEL_PATH, help="Scaler-folded model, used for the scaling when it matches --model/--scaler")
+    parser.add_argument('-k', type=int, default=DEFAULT_K)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    index = load_index(args.data, args.scaler, args.model, args.folded)
+    print(f"Index over {len(index):,} records ready in {time.perf_counter() - start:.3f}s", file=sys.stderr)
+
+    features = encode_frame(index.records).to_numpy()
+    times = []
+    for row in features[:1000]:
+        t = time.perf_counter()
+        index.query(row, args.k)
+        times.append(time.perf_counter() - t)
+    p50, p99 = np.percentile(times, [50, 99]) * 1000
+    print(f"single query (k={args.k}): p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+
+    t = time.perf_counter()
+    index.query(features, args.k)
+    elapsed = time.perf_counter() - t
+    print(f"batch of {len(features):,}: {elapsed:.3f}s ({len(features) / elapsed:,.0f} rows/sec)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+import time
+
+import numpy as np
+
+from features import ENCODER
+from whatif import NUMERIC_SWEEPS, score_rows, sweep_values
+
+# =============================
+# COUNTERFACTUAL TARGET PLANNER
+# =============================
+# Finds the cheapest combination of changes to the changeable features that
+# reaches a target score. Total cost is additive per feature, so the search
+# walks outward in cost bands: each band only builds the candidates whose
+# cost falls inside it (axes whose own cost already exceeds the band are
+# pruned), scores them as one batch, and stops at the first band that
+# contains a solution.
+CHANGEABLE = ['study_hours', 'class_attendance', 'sleep_hours', 'sleep_quality', 'study_method']
+
+# Cost per unit of change (hours, attendance %, quality step, method switch)
+COST_WEIGHTS = {
+    'study_hours': 1.0,
+    'class_attendance': 0.1,
+    'sleep_hours': 0.5,
+    'sleep_quality': 1.5,
+    'study_method': 2.0,
+}
+
+SLEEP_QUALITY_ORDER = ['poor', 'average', 'good']
+
+COST_BAND = 0.5
+MAX_BATCH = 200_000
+
+
+def _axis(feature, current, weights, encoder):
+    values = sweep_values(feature, encoder=encoder)
+    if feature in NUMERIC_SWEEPS:
+        encoded = np.array(values, dtype=float)
+        cost = np.abs(encoded - current) * weights[feature]
+    elif feature == 'sleep_quality':
+        encoded = np.array([encoder.mappings[feature][v] for v in values], dtype=float)
+        step = {q: i for i, q in enumerate(SLEEP_QUALITY_ORDER)}
+        cost = np.array([abs(step[v] - step[current]) for v in values], dtype=float) * weights[feature]
+    else:
+        encoded = np.array([encoder.mappings[feature][v] for v in values], dtype=float)
+        cost = np.array([0.0 if v == current else 1.0 for v in values]) * weights[feature]
+    return values, encoded, cost
+
+
+def _describe(profile, axes, combo):
+    changes = {}
+    for (feature, values, _, _), i in zip(axes, combo):
+        if values[i] != profile[feature]:
+            changes[feature] = (profile[feature], values[i])
+    return changes
+
+
+def plan_changes(profile, target, model, scaler, weights=COST_WEIGHTS, time_budget=0.5, max_results=3,
+                 encoder=ENCODER):
+    start = time.perf_counter()
+    weights = {**COST_WEIGHTS, **weights}
+    base = np.array(encoder.encode_profile(profile), dtype=float)
+    col_index = {col: i for i, col in enumerate(encoder.feature_columns)}
+
+    axes = [(f, *_axis(f, profile[f], weights, encoder)) for f in CHANGEABLE]
+    max_cost = sum(cost.max() for _, _, _, cost in axes)
+
+    evaluated = 0
+    best_seen = None
+    timed_out = False
+    lo = 0.0
+    while lo <= max_cost:
+        hi = lo + COST_BAND
+        # Prune each axis to options that can still fit in this band
+        keep = [np.nonzero(cost < hi)[0] for _, _, _, cost in axes]
+        grid_cost = np.zeros([len(k) for k in keep])
+        for dim, ((_, _, _, cost), k) in enumerate(zip(axes, keep)):
+            shape = [1] * len(keep)
+            shape[dim] = len(k)
+            grid_cost = grid_cost + cost[k].reshape(shape)
+
+        in_band = np.nonzero((grid_cost >= lo) & (grid_cost < hi))
+        combos = np.stack([k[i] for k, i in zip(keep, in_band)], axis=1)
+        costs = grid_cost[in_band]
+
+        # Hits from every sub-batch of the band are ranked together
+        hits = []
+        for offset in range(0, len(combos), MAX_BATCH):
+            batch = combos[offset:offset + MAX_BATCH]
+            rows = np.tile(base, (len(batch), 1))
+            for dim, (feature, _, encoded, _) in enumerate(axes):
+                rows[:, col_index[feature]] = encoded[batch[:, dim]]
+            scores = score_rows(model, scaler, rows, encoder)
+            evaluated += len(batch)
+
+            top = int(np.argmax(scores))
+            if best_seen is None or scores[top] > best_seen[1]:
+                best_seen = (batch[top], float(scores[top]), float(costs[offset + top]))
+
+            reached = np.nonzero(scores >= target)[0]
+            if len(reached):
+                hits.append((batch[reached], scores[reached], costs[offset + reached]))
+
+            if time.perf_counter() - start > time_budget:
+                timed_out = True
+                break
+
+        if hits:
+            hit_combos, hit_scores, hit_costs = (np.concatenate(part) for part in zip(*hits))
+            # Cheapest first, higher score breaks ties
+            order = np.lexsort((-hit_scores, hit_costs))[:max_results]
+            plans = [{
+                'changes': _describe(profile, axes, hit_combos[i]),
+                'cost': round(float(hit_costs[i]), 2),
+                'score': float(hit_scores[i]),
+            } for i in order]
+            return {'reached': True, 'timed_out': timed_out, 'plans': plans, 'evaluated': evaluated,
+                    'seconds': time.perf_counter() - start}
+
+        if timed_out:
+            break
+        lo = hi
+
+    # Target not reached, or the budget ran out first (timed_out): report
+    # the best candidate seen
+    plans = []
+    if best_seen is not None:
+        plans.append({'changes': _describe(profile, axes, best_seen[0]),
+                      'cost': round(best_seen[2], 2), 'score': best_seen[1]})
+    return {'reached': False, 'timed_out': timed_out, 'plans': plans, 'evaluated': evaluated,
+            'seconds': time.perf_counter() - start}
@@ -0,0 +1,112 @@
+import threading
+import time
+
+# =============================
+# MODEL HOT-RELOAD
+# =============================
+# Holds the active (model, scaler, encoder, version) as one tuple. The
+# encoder is the feature schema shipped with that model, so category codes
+# always match the weights. Readers grab the tuple once per rerun, so a
+# session always scores with one consistent version. When the artifact fingerprint changes, the new version is loaded
+# and warmed up on a background thread while the old one keeps serving, then
+# swapped in with a single reference assignment.
+POLL_INTERVAL = 2.0
+# Files are replaced one at a time by train.py --promote; wait for the set to
+# settle so a new model is never paired with the old scaler
+SETTLE_SECONDS = 0.5
+WARMUP_ROWS = 256
+
+
+class ModelManager:
+    def __init__(self, loader, fingerprint, warmup=None, poll_interval=POLL_INTERVAL, settle=SETTLE_SECONDS):
+        # loader(fp) -> (model, scaler, encoder); fingerprint() -> current fp
+        # or None; warmup(model, scaler, encoder) runs a dummy batch through
+        # the new version
+        self.loader = loader
+        self.fingerprint = fingerprint
+        self.warmup = warmup
+        self.poll_interval = poll_interval
+        self.settle = settle
+        self._active = (None, None, None, None)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._last_poll = 0.0
+        self.pending = None
+        self.swaps = 0
+        self.last_error = None
+
+    def current(self):
+        # (model, scaler, encoder, version); blocks only for the very first load
+        model, scaler, encoder, version = self._active
+        if version is None:
+            with self._lock:
+                if self._active[3] is None:
+                    fingerprint = self.fingerprint()
+                    if fingerprint is not None:
+                        self._activate(fingerprint)
+            return self._active
+        self.poll()
+        return model, scaler, encoder, version
+
+    def poll(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._last_poll < self.poll_interval:
+            return
+        self._last_poll = now
+        try:
+            fingerprint = self.fingerprint()
+        except OSError:
+            return
+        active = self._active[3]
+        if fingerprint is None or (active and fingerprint == active['fingerprint']):
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self.pending = fingerprint
+            self._thread = threading.Thread(target=self._reload, args=(fingerprint,), daemon=True,
+                                            name='model-reload')
+            self._thread.start()
+
+    def _reload(self, fingerprint):
+        try:
+            time.sleep(self.settle)
+            if self.fingerprint() != fingerprint:
+                # Still being written; the next poll picks up the final set
+                return
+            self._activate(fingerprint)
+        except Exception as e:
+            self.last_error = {'fingerprint': fingerprint, 'error': str(e), 'at': time.time()}
+        finally:
+            self.pending = None
+
+    def _activate(self, fingerprint):
+        start = time.perf_counter()
+        model, scaler, encoder = self.loader(fingerprint)
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if self.warmup:
+            self.warmup(model, scaler, encoder)
+        warmup_seconds = time.perf_counter() - start
+
+        if self.fingerprint() != fingerprint:
+            raise RuntimeError("Artifacts changed while loading; will retry")
+        version = {
+            'fingerprint': fingerprint,
+            'loaded_at': time.time(),
+            'load_seconds': load_seconds,
+            'warmup_seconds': warmup_seconds,
+            'scaler_folded': model is not None and scaler is None,
+        }
+        self._active = (model, scaler, encoder, version)
+        self.swaps += 1
+        self.last_error = None
+
+    def status(self):
+        return {
+            'active': self._active[3],
+            'pending': self.pending,
+            'swaps': self.swaps,
+            'last_error': self.last_error,
+        }
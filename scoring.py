@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from features import ENCODER
+from telemetry import timed
+
+# =============================
+# BULK SCORING
+# =============================
+# Rows are read, encoded and scored a chunk at a time so memory stays
+# bounded by the chunk size no matter how large the uploaded file is.
+BULK_CHUNK_ROWS = 50_000
+MODEL_BATCH_SIZE = 8192
+
+
+def scale_features(scaler, features):
+    # scaler is None for a model with the scaler folded into its first layer,
+    # which takes the encoded features as they are
+    if scaler is None:
+        return np.asarray(features, dtype=np.float32)
+    return scaler.transform(features)
+
+
+def predict_scores(model, scaler, features, encoder=None):
+    # One scaler.transform and batched model calls for a whole encoded frame;
+    # with an encoder, features is a raw frame encoded with that schema first
+    if encoder is not None:
+        features = encoder.encode_frame(features)
+    scaled = scale_features(scaler, features)
+    scores = model.predict(scaled, batch_size=MODEL_BATCH_SIZE, verbose=0)[:, 0]
+    return np.clip(scores, 0, 100)
+
+
+def predict_row(model, scaler, row):
+    # Single-row hot path behind get_prediction(): row is an encoded 11-value list
+    if scaler is None:
+        scaled_data = np.array([row], dtype=np.float32)
+    else:
+        with timed('scale'):
+            scaled_data = scaler.transform(np.array([row]))
+    with timed('predict'):
+        prediction = float(model.predict(scaled_data, verbose=0)[0][0])
+    return max(0, min(100, prediction))
+
+
+def score_frame(df, model, scaler, neighbors=None, k=5, encoder=ENCODER):
+    # neighbors: optional NeighborIndex; adds the mean actual score of each
+    # row's k most similar students, queried as one batch per chunk.
+    # encoder: the feature schema the model was trained with
+    scored = df.copy()
+    features = encoder.encode_frame(df)
+    scored['predicted_score'] = np.round(predict_scores(model, scaler, features), 2)
+    if neighbors is not None:
+        scored['similar_students_score'] = np.round(neighbors.neighbor_scores(features, k), 2)
+    return scored
+
+
+def score_csv(source, output, model, scaler, chunksize=BULK_CHUNK_ROWS, on_progress=None, neighbors=None, k=5,
+              encoder=ENCODER):
+    # Streams source -> output (any file-like); returns the number of rows scored
+    rows = 0
+    for i, chunk in enumerate(pd.read_csv(source, chunksize=chunksize)):
+        score_frame(chunk, model, scaler, neighbors, k, encoder).to_csv(output, header=(i == 0), index=False)
+        rows += len(chunk)
+        if on_progress:
+            on_progress(rows)
+    return rows
@@ -0,0 +1,296 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from features import FEATURE_COLUMNS, encode_profile
+from artifacts import DATA_PATH, FOLDED_MODEL_PATH, MODEL_PATH, SCALER_PATH
+from inference import load_serving_assets
+from scoring import predict_scores
+
+# =============================
+# ASYNC PREDICTION SERVICE
+# =============================
+# Minimal HTTP/1.1 (keep-alive, JSON bodies) on asyncio streams.
+#   POST /predict  one profile object or a list of them -> {"scores": [...]}
+#   GET  /stats    latency percentiles and batch-size stats
+#   GET  /health
+# Concurrent requests that arrive within --window-ms of each other are
+# coalesced into a single forward pass.
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+STATS_WINDOW = 10_000
+
+
+def _percentiles(values):
+    if not values:
+        return {'p50': None, 'p95': None, 'p99': None}
+    p50, p95, p99 = np.percentile(np.fromiter(values, dtype=float), [50, 95, 99])
+    return {'p50': round(p50, 3), 'p95': round(p95, 3), 'p99': round(p99, 3)}
+
+
+class ServiceStats:
+    def __init__(self, window=STATS_WINDOW):
+        # Bounded: only the most recent `window` samples are kept
+        self.latencies_ms = deque(maxlen=window)
+        self.batch_sizes = deque(maxlen=window)
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.errors = 0
+        self.started = time.time()
+
+    def record_request(self, latency_ms, rows):
+        self.requests += 1
+        self.rows += rows
+        self.latencies_ms.append(latency_ms)
+
+    def record_batch(self, size):
+        self.batches += 1
+        self.batch_sizes.append(size)
+
+    def snapshot(self):
+        sizes = list(self.batch_sizes)
+        return {
+            'uptime_s': round(time.time() - self.started, 1),
+            'requests': self.requests,
+            'rows': self.rows,
+            'errors': self.errors,
+            'batches': self.batches,
+            'latency_ms': _percentiles(self.latencies_ms),
+            'batch_size': {
+                'mean': round(float(np.mean(sizes)), 2) if sizes else None,
+                'max': max(sizes) if sizes else None,
+                **_percentiles(sizes),
+            },
+        }
+
+
+class MicroBatcher:
+    def __init__(self, model, scaler, stats, window_ms=2.0, max_batch=512):
+        self.model = model
+        self.scaler = scaler
+        self.stats = stats
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.queue = asyncio.Queue()
+
+    async def submit(self, rows):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((rows, future))
+        return await future
+
+    async def run(self):
+        while True:
+            items = [await self.queue.get()]
+            # Give concurrent requests one window to pile up, then drain
+            await asyncio.sleep(self.window)
+            size = len(items[0][0])
+            while size < self.max_batch and not self.queue.empty():
+                item = self.queue.get_nowait()
+                items.append(item)
+                size += len(item[0])
+
+            features = pd.DataFrame([row for rows, _ in items for row in rows], columns=FEATURE_COLUMNS)
+            try:
+                scores = predict_scores(self.model, self.scaler, features)
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.stats.record_batch(size)
+            offset = 0
+            for rows, future in items:
+                if not future.done():
+                    future.set_result(scores[offset:offset + len(rows)].tolist())
+                offset += len(rows)
+
+
+class PredictionService:
+    def __init__(self, model, scaler, window_ms=2.0, max_batch=512):
+        self.stats = ServiceStats()
+        self.batcher = MicroBatcher(model, scaler, self.stats, window_ms, max_batch)
+
+    async def start(self, host='127.0.0.1', port=8080):
+        self._batch_task = asyncio.create_task(self.batcher.run())
+        return await asyncio.start_server(self._handle, host, port)
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                status, payload = await self._route(method, path, body)
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, body):
+        path = path.split('?', 1)[0]
+        if path == '/health':
+            return 200, {'status': 'ok'}
+        if path == '/stats':
+            return 200, self.stats.snapshot()
+        if path != '/predict':
+            return 404, {'error': f"Unknown path: {path}"}
+        if method != 'POST':
+            return 405, {'error': "Use POST"}
+
+        start = time.perf_counter()
+        try:
+            payload = json.loads(body)
+            profiles = payload if isinstance(payload, list) else [payload]
+            rows = [encode_profile(p) for p in profiles]
+        except (ValueError, TypeError, AttributeError) as e:
+            self.stats.errors += 1
+            return 400, {'error': str(e)}
+        if not rows:
+            return 200, {'scores': []}
+
+        try:
+            scores = await self.batcher.submit(rows)
+        except Exception as e:
+            self.stats.errors += 1
+            return 500, {'error': str(e)}
+        self.stats.record_request((time.perf_counter() - start) * 1000, len(rows))
+        return 200, {'scores': [round(s, 2) for s in scores]}
+
+
+def load_service(model_path, scaler_path, window_ms, max_batch, folded_path=FOLDED_MODEL_PATH):
+    model, scaler = load_serving_assets(model_path, scaler_path, folded_path)
+    return PredictionService(model, scaler, window_ms, max_batch)
+
+
+# =============================
+# LOAD-TEST CLIENT
+# =============================
+async def _post(reader, writer, host, path, payload):
+    data = json.dumps(payload).encode()
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+    )
+    await writer.drain()
+    await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        if key.strip().lower() == 'content-length':
+            length = int(value)
+    return json.loads(await reader.readexactly(length))
+
+
+async def load_test(host, port, csv_path=DATA_PATH, requests=5000, concurrency=64):
+    profiles = pd.read_csv(csv_path, nrows=requests)[FEATURE_COLUMNS].to_dict('records')
+    todo = deque(profiles[i % len(profiles)] for i in range(requests))
+    latencies = []
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while todo:
+                profile = todo.popleft()
+                start = time.perf_counter()
+                await _post(reader, writer, host, '/predict', profile)
+                latencies.append((time.perf_counter() - start) * 1000)
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET /stats HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+    raw = await reader.read()
+    writer.close()
+    server_stats = json.loads(raw.split(b'\r\n\r\n', 1)[1])
+
+    return {
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'seconds': round(elapsed, 3),
+        'requests_per_sec': round(len(latencies) / elapsed, 1),
+        'client_latency_ms': _percentiles(latencies),
+        'server': server_stats,
+    }
+
+
+async def _serve_forever(args):
+    service = load_service(args.model, args.scaler, args.window_ms, args.max_batch, args.folded)
+    server = await service.start(args.host, args.port)
+    print(f"Serving on http://{args.host}:{args.port} (window {args.window_ms}ms, max batch {args.max_batch})",
+          file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+async def _load_test_local(args):
+    # Spin up the service in-process on an ephemeral port and hammer it
+    service = load_service(args.model, args.scaler, args.window_ms, args.max_batch, args.folded)
+    server = await service.start(args.host, 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        return await load_test(args.host, port, args.csv, args.requests, args.concurrency)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-batching HTTP service for exam score predictions.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--scaler', default=SCALER_PATH)
+    parser.add_argument('--folded', default=FOLDED_MODEL_PATH, help="Scaler-folded model, used when it matches --model/--scaler")
+    parser.add_argument('--window-ms', type=float, default=2.0, help="Batching window for concurrent requests")
+    parser.add_argument('--max-batch', type=int, default=512, help="Max rows per forward pass")
+    sub = parser.add_subparsers(dest='command')
+    sub.add_parser('serve', help="Run the service (default)")
+    lt = sub.add_parser('loadtest', help="Replay rows from the dataset against the service")
+    lt.add_argument('--csv', default=DATA_PATH)
+    lt.add_argument('--requests', type=int, default=5000)
+    lt.add_argument('--concurrency', type=int, default=64)
+    lt.add_argument('--local', action='store_true', help="Start an in-process server instead of using --host/--port")
+    args = parser.parse_args(argv)
+
+    if args.command == 'loadtest':
+        if args.local:
+            result = asyncio.run(_load_test_local(args))
+        else:
+            result = asyncio.run(load_test(args.host, args.port, args.csv, args.requests, args.concurrency))
+        print(json.dumps(result, indent=2))
+    else:
+        asyncio.run(_serve_forever(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+import json
+import os
+import time
+
+# =============================
+# COLD-START TIMING
+# =============================
+# Imported modules survive Streamlit reruns, so this dict lives for the
+# whole server process and records the first render of each page. Only the
+# first page visited pays for the imports; the others start warm.
+COLD_START_LOG = os.environ.get('EXAM_COLD_START_LOG', 'cold_start.jsonl')
+
+_cold_starts = {}
+
+
+def record_cold_start(page, seconds):
+    if page in _cold_starts:
+        return
+    _cold_starts[page] = seconds
+    entry = {'ts': time.time(), 'pid': os.getpid(), 'page': page, 'seconds': round(seconds, 4)}
+    try:
+        with open(COLD_START_LOG, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    except OSError:
+        pass
+
+
+def cold_start_times():
+    return dict(_cold_starts)
@@ -1,10 +1,17 @@
+import time
+_script_start = time.perf_counter()
+
+import io
+import os
+
 import streamlit as st
 import numpy as np
 import pandas as pd
-import tensorflow as tf
-import joblib
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+
+from artifacts import DATA_PATH, FOLDED_MODEL_PATH, MODEL_PATH, SCALER_PATH, SCHEMA_PATH, artifact_fingerprint, file_digest
+from features import ENCODER, FEATURE_LABELS
+from startup import cold_start_times, record_cold_start
+import telemetry
 
 # =============================
 # PAGE CONFIGURATION
@@ -279,30 +286,310 @@ apply_premium_theme()
 # =============================
 # LOAD ASSETS
 # =============================
+# NumPy inference is the default; set EXAM_INFERENCE_BACKEND=keras to serve
+# through TensorFlow instead (e.g. to cross-check a new model).
+INFERENCE_BACKEND = os.environ.get('EXAM_INFERENCE_BACKEND', 'numpy')
+
+# Heavy imports (h5py/TensorFlow, joblib/sklearn) happen inside, and
+# assets are only requested from the Score Prediction page, so the other
+# pages never pay for them.
+# With the NumPy backend the scaler-folded model (fold.py) is used when it
+# was built from the current model + scaler; scaler is None in that case.
+# The feature schema deployed with the model is loaded alongside it, so a
+# hot swap never pairs new weights with old category codes.
+def load_assets(fingerprint):
+    from features import FeatureEncoder
+    from inference import NumpyModel, load_folded_model, load_keras_model
+    encoder = FeatureEncoder.load(SCHEMA_PATH)
+    if INFERENCE_BACKEND == 'keras':
+        model = load_keras_model(MODEL_PATH)
+    else:
+        model = load_folded_model(FOLDED_MODEL_PATH, fingerprint)
+        if model is not None:
+            return model, None, encoder
+        model = NumpyModel.load(MODEL_PATH)
+
+    import joblib
+    return model, joblib.load(SCALER_PATH), encoder
+
+def warm_up(model, scaler, encoder):
+    # One batch and one single-row call, so the first real request after a
+    # swap doesn't pay for allocation or (Keras) graph tracing
+    from reloader import WARMUP_ROWS
+    from scoring import predict_scores
+    columns = encoder.feature_columns
+    for rows in (WARMUP_ROWS, 1):
+        predict_scores(model, scaler, pd.DataFrame(np.zeros((rows, len(columns))), columns=columns))
+
+# New artifacts on disk are noticed on a rerun (at most every 2s), loaded
+# and warmed up in the background, and swapped in without blocking anyone.
 @st.cache_resource
-def load_assets():
+def model_manager():
+    from reloader import ModelManager
+    return ModelManager(load_assets, current_fingerprint, warm_up)
+
+def current_assets():
+    # (model, scaler, encoder, version) for this rerun; all None = demo mode
     try:
-        model = tf.keras.models.load_model('exam_model.h5')
-        scaler = joblib.load('scaler.pkl')
-        return model, scaler
+        return model_manager().current()
     except Exception as e:
         st.error(f"Error loading assets: {e}")
-        return None, None
+        return None, None, None, None
 
-model, scaler = load_assets()
+def current_fingerprint():
+    try:
+        return artifact_fingerprint(MODEL_PATH, SCALER_PATH)
+    except OSError:
+        return None
 
-# =============================
-# MAPPINGS
-# =============================
-MAPPINGS = {
-    'gender': {'female': 0, 'male': 1, 'other': 2},
-    'course': {'b.com': 0, 'b.sc': 1, 'b.tech': 2, 'ba': 3, 'bba': 4, 'bca': 5, 'diploma': 6},
-    'internet_access': {'no': 0, 'yes': 1},
-    'study_method': {'coaching': 0, 'group study': 1, 'mixed': 2, 'online videos': 3, 'self-study': 4},
-    'facility_rating': {'high': 0, 'low': 1, 'medium': 2},
-    'exam_difficulty': {'easy': 0, 'hard': 1, 'moderate': 2},
-    'sleep_quality': {'average': 0, 'good': 1, 'poor': 2}
-}
+def model_size_label():
+    try:
+        return f"{os.path.getsize(MODEL_PATH) / 1024:.1f} KB"
+    except OSError:
+        return "—"
+
+def load_benchmark():
+    # Last `python benchmark.py` run, or None
+    from benchmark import load_results
+    return load_results()
+
+def load_model_card():
+    # Measured metrics (`python evaluate.py card`) for the artifacts on disk,
+    # or None if they haven't been measured since the model/scaler changed
+    from evaluate import MODEL_CARD_PATH, load_json
+    card = load_json(MODEL_CARD_PATH)
+    if card and card['fingerprint'] == current_fingerprint():
+        return card
+    return None
+
+ACTIVATION_NAMES = {'relu': 'ReLU', 'linear': 'Linear'}
+
+def architecture_label(card):
+    return "-".join(str(layer['units']) for layer in card['architecture'] if layer['type'] == 'Dense')
+
+def architecture_lines(card):
+    lines = [f"<b>Input:</b> {len(FEATURE_LABELS)} Features"]
+    dense = [layer for layer in card['architecture'] if layer['type'] == 'Dense']
+    for layer in card['architecture']:
+        if layer['type'] == 'Dropout':
+            lines.append(f"<b>Dropout:</b> {layer['rate']:g}")
+        elif layer is dense[-1]:
+            lines.append(f"<b>Output Layer:</b> {layer['units']} Neuron ({ACTIVATION_NAMES.get(layer['activation'], layer['activation'])})")
+        else:
+            lines.append(f"<b>Dense Layer {dense.index(layer) + 1}:</b> {layer['units']} Neurons ({ACTIVATION_NAMES.get(layer['activation'], layer['activation'])})")
+    training = card['training']
+    lines.append(f"<b>Optimizer:</b> {card['optimizer']} ({card['learning_rate']:g})")
+    lines.append(f"<b>Loss Function:</b> {card['loss'].replace('_', ' ').title()}")
+    lines.append(f"<b>Epochs:</b> up to {training['max_epochs']}, early stopping (patience {training['patience']}), batch {training['batch_size']}")
+    return lines
+
+# Keyed on the CSV digest: rebuilt (or read back from .cache) only when the
+# dataset changes, otherwise a dict lookup per rerun.
+@st.cache_resource(max_entries=1)
+def load_analytics_cube(digest):
+    from analytics import load_cube
+    return load_cube(DATA_PATH)
+
+# Set EXAM_PREDICTION_CACHE_DB to a shared path (e.g. on a volume mounted by
+# every replica) to enable the on-disk tier behind the in-process LRU.
+@st.cache_resource
+def load_prediction_cache():
+    from cache import PredictionCache
+    return PredictionCache(
+        maxsize=int(os.environ.get('EXAM_PREDICTION_CACHE_SIZE', 4096)),
+        disk_path=os.environ.get('EXAM_PREDICTION_CACHE_DB') or None
+    )
+
+# One background writer per process; set EXAM_AUDIT_DB= (empty) to disable
+@st.cache_resource
+def load_audit_log():
+    from audit import AUDIT_DB, AuditLog
+    if not AUDIT_DB:
+        return None
+    try:
+        return AuditLog(AUDIT_DB)
+    except Exception:
+        return None
+
+# Process-wide: every session's predictions feed the same histograms.
+# Reference bins are rebuilt (or read back from .cache) when the CSV changes.
+@st.cache_resource(max_entries=1)
+def load_drift_monitor(digest):
+    from drift import load_monitor
+    return load_monitor(DATA_PATH)
+
+# Rebuilt (or read back from .cache) only when the CSV or scaler changes
+@st.cache_resource(max_entries=1)
+def load_neighbor_index(digests):
+    from neighbors import load_index
+    return load_index(DATA_PATH, SCALER_PATH)
+
+# One entry per (artifacts, profile, axes): changing the axes back and forth
+# or rerunning for another widget reuses the grid instead of re-scoring it.
+@st.cache_data(max_entries=64, show_spinner=False)
+def score_heatmap(fingerprint, profile_items, x_feature, y_feature, _model, _scaler, _encoder):
+    from whatif import score_grid
+    start = time.perf_counter()
+    x_values, y_values, scores = score_grid(dict(profile_items), _model, _scaler, x_feature, y_feature, _encoder)
+    return x_values, y_values, scores, time.perf_counter() - start
+
+# Figures are kept as objects: building one through Plotly's validators
+# costs more than the prediction itself, while st.plotly_chart only
+# serializes it. Nothing mutates them afterwards, so sessions share them.
+@st.cache_resource(max_entries=64)
+def gauge_figure(score, color):
+    import plotly.graph_objects as go
+    fig = go.Figure(go.Indicator(
+        mode = "gauge+number+delta",
+        value = score,
+        title = {'text': "Academic Performance Score", 'font': {'color': '#f5c77a', 'size': 20}},
+        delta = {'reference': 50, 'increasing': {'color': "#22c55e"}},
+        domain = {'x': [0, 1], 'y': [0, 1]},
+        gauge = {
+            'axis': {'range': [0, 100], 'tickwidth': 1, 'tickcolor': '#f5c77a'},
+            'bar': {'color': color, 'thickness': 0.3},
+            'bgcolor': "rgba(0,0,0,0)",
+            'borderwidth': 2,
+            'bordercolor': "rgba(245, 199, 122, 0.3)",
+            'steps': [
+                {'range': [0, 40], 'color': 'rgba(239, 68, 68, 0.3)'},
+                {'range': [40, 70], 'color': 'rgba(245, 158, 11, 0.3)'},
+                {'range': [70, 85], 'color': 'rgba(250, 204, 21, 0.3)'},
+                {'range': [85, 100], 'color': 'rgba(34, 197, 94, 0.3)'}
+            ],
+            'threshold': {
+                'line': {'color': "rgba(245, 199, 122, 0.8)", 'width': 4},
+                'thickness': 0.75,
+                'value': score
+            }
+        }
+    ))
+
+    fig.update_layout(
+        height=350,
+        margin=dict(l=50, r=50, t=80, b=50),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font={'color': '#f5c77a'}
+    )
+    return fig
+
+# The sweep and both What-If charts for one profile
+@st.cache_resource(max_entries=64)
+def whatif_figures(fingerprint, profile_items, color, _model, _scaler, _encoder):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    from whatif import NUMERIC_SWEEPS, sensitivity_sweep
+
+    profile = dict(profile_items)
+    base_score, curves = sensitivity_sweep(profile, _model, _scaler, encoder=_encoder)
+
+    curve_fig = make_subplots(rows=1, cols=3, subplot_titles=[FEATURE_LABELS[f] for f in NUMERIC_SWEEPS])
+    for i, feature in enumerate(NUMERIC_SWEEPS, start=1):
+        curve = curves[feature]
+        curve_fig.add_trace(go.Scatter(
+            x=curve['value'], y=curve['score'], mode='lines',
+            line=dict(color='#f5c77a', width=3), showlegend=False
+        ), row=1, col=i)
+        curve_fig.add_trace(go.Scatter(
+            x=[profile[feature]], y=[base_score], mode='markers',
+            marker=dict(color=color, size=12), showlegend=False
+        ), row=1, col=i)
+    curve_fig.update_yaxes(title_text="Predicted Score", row=1, col=1)
+    curve_fig.update_layout(
+        height=320,
+        margin=dict(l=50, r=30, t=50, b=40),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font={'color': '#f5c77a'}
+    )
+
+    options = [
+        (f"{FEATURE_LABELS[feature]}: {value}", delta)
+        for feature in _encoder.mappings
+        for value, delta in zip(curves[feature]['value'], curves[feature]['delta'])
+        if value != profile[feature]
+    ]
+    options.sort(key=lambda o: o[1])
+    option_fig = go.Figure(go.Bar(
+        y=[label for label, _ in options],
+        x=[delta for _, delta in options],
+        orientation='h',
+        marker=dict(color=['#22c55e' if d > 0 else '#ef4444' for _, d in options])
+    ))
+    option_fig.update_layout(
+        title="Score change if you switch one option",
+        xaxis_title="Points vs. current profile",
+        height=max(300, 22 * len(options)),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font={'color': '#f5c77a'},
+        xaxis=dict(showgrid=True, gridcolor='rgba(245, 199, 122, 0.1)')
+    )
+    return base_score, curves, curve_fig, option_fig
+
+# Not cached itself: score_heatmap already keeps the grid, and the figure
+# is built per run so no session shares it
+def heatmap_figure(fingerprint, profile_items, x_feature, y_feature, _model, _scaler, _encoder):
+    import plotly.graph_objects as go
+    profile = dict(profile_items)
+    x_values, y_values, grid_scores, grid_seconds = score_heatmap(
+        fingerprint, profile_items, x_feature, y_feature, _model, _scaler, _encoder
+    )
+    fig = go.Figure(go.Heatmap(
+        x=x_values, y=y_values, z=grid_scores,
+        colorscale=[[0, '#ef4444'], [0.5, '#f59e0b'], [0.7, '#facc15'], [1, '#22c55e']],
+        zmin=0, zmax=100,
+        colorbar=dict(title="Score"),
+        hovertemplate=f"{FEATURE_LABELS[x_feature]}: %{{x}}<br>{FEATURE_LABELS[y_feature]}: %{{y}}<br>Score: %{{z:.1f}}<extra></extra>"
+    ))
+    fig.add_trace(go.Scatter(
+        x=[profile[x_feature]], y=[profile[y_feature]], mode='markers',
+        marker=dict(color='#ffffff', size=12, symbol='x'), name="You", showlegend=False
+    ))
+    fig.update_layout(
+        height=420,
+        margin=dict(l=50, r=30, t=30, b=40),
+        xaxis_title=FEATURE_LABELS[x_feature],
+        yaxis_title=FEATURE_LABELS[y_feature],
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font={'color': '#f5c77a'}
+    )
+    return fig, grid_scores.size, grid_seconds
+
+# Only changes when importance.py is rerun for a new model or dataset
+@st.cache_resource(max_entries=4)
+def importance_figure(features, importance, n_repeats):
+    import plotly.graph_objects as go
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        y=features,
+        x=importance,
+        orientation='h',
+        marker=dict(
+            color=importance,
+            colorscale='YlOrBr',  # Changed from 'gold' to valid Plotly colorscale
+            showscale=True,
+            colorbar=dict(title="Importance %")
+        ),
+        text=[f'{x:.1f}%' for x in importance],
+        textposition='outside'
+    ))
+
+    fig.update_layout(
+        title=f"Permutation Importance (MSE increase, {n_repeats} shuffles)",
+        xaxis_title="Importance (%)",
+        yaxis_title="Features",
+        height=500,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#f5c77a'),
+        xaxis=dict(showgrid=True, gridcolor='rgba(245, 199, 122, 0.1)'),
+        yaxis=dict(showgrid=False)
+    )
+    return fig
 
 # =============================
 # SIDEBAR NAVIGATION
@@ -322,6 +609,14 @@ st.sidebar.markdown("---")
 # DASHBOARD PAGE
 # =============================
 if page == "🏠 Dashboard":
+    bench = load_benchmark()
+    card = load_model_card()
+    cv = card['cross_validation'] if card else None
+    if bench:
+        speed_label = f"{bench['metrics']['single_row_p50_ms']:.2f} ms (p50), {bench['metrics']['single_row_p99_ms']:.2f} ms (p99)"
+    else:
+        speed_label = "Not benchmarked yet"
+    
     st.markdown("<div class='card'>", unsafe_allow_html=True)
     
     col1, col2, col3 = st.columns([2, 1, 1])
@@ -337,7 +632,12 @@ if page == "🏠 Dashboard":
         """, unsafe_allow_html=True)
     
     with col2:
-        st.metric("Model Accuracy", "94.2%", "±2.1%")
+        if cv:
+            st.metric("Model R²", f"{cv['r2']['mean']:.3f}", f"±{cv['r2']['std']:.3f} ({cv['k']}-fold CV)", delta_color="off")
+        elif card:
+            st.metric("Model R²", f"{card['holdout']['r2']:.3f}", "holdout", delta_color="off")
+        else:
+            st.metric("Model R²", "—", "Run evaluate.py card", delta_color="off")
     
     with col3:
         st.metric("Dataset Size", "20,000+", "Records")
@@ -348,16 +648,25 @@ if page == "🏠 Dashboard":
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Neural Network", "3 Layers", "128-64-32")
+        if card:
+            st.metric("Neural Network", architecture_label(card), f"{card['parameters']:,} parameters", delta_color="off")
+        else:
+            st.metric("Neural Network", "—", "Run evaluate.py card", delta_color="off")
     
     with col2:
-        st.metric("Training Time", "8.4 mins", "GPU Accelerated")
+        if cv:
+            st.metric("Training Time", f"{cv['fit_seconds']:.0f}s", "per fold, CPU (measured)", delta_color="off")
+        else:
+            st.metric("Training Time", "—", "Run evaluate.py card", delta_color="off")
     
     with col3:
         st.metric("Features", "11", "Demographic + Academic")
     
     with col4:
-        st.metric("Prediction Speed", "< 0.2s", "Real-time")
+        if bench:
+            st.metric("Prediction Speed", f"{bench['metrics']['single_row_p50_ms']:.2f} ms", "p50, measured", delta_color="off")
+        else:
+            st.metric("Prediction Speed", "—", "Run benchmark.py", delta_color="off")
     
     # Model Architecture
     st.markdown("<div class='card'>", unsafe_allow_html=True)
@@ -365,36 +674,42 @@ if page == "🏠 Dashboard":
     
     col1, col2 = st.columns(2)
     
+    if card:
+        spec_items = "".join(f"<li>{line}</li>" for line in architecture_lines(card))
+        holdout = card['holdout']
+        metric_lines = []
+        if cv:
+            metric_lines += [
+                f"<b>R² Score:</b> {cv['r2']['mean']:.3f} ± {cv['r2']['std']:.3f} ({cv['k']}-fold CV)",
+                f"<b>MAE:</b> {cv['mae']['mean']:.2f} ± {cv['mae']['std']:.2f} points",
+                f"<b>RMSE:</b> {cv['rmse']['mean']:.2f} ± {cv['rmse']['std']:.2f} points",
+                f"<b>Training Time:</b> {cv['fit_seconds']:.0f}s per fold ({cv['epochs_run']:.1f} epochs)",
+            ]
+        metric_lines.append(f"<b>Holdout ({holdout['rows']:,} rows):</b> R² {holdout['r2']:.3f}, MAE {holdout['mae']:.2f}, RMSE {holdout['rmse']:.2f}")
+    else:
+        spec_items = "<li>Not measured for the deployed model yet. Run <code>python evaluate.py card</code>.</li>"
+        metric_lines = []
+    metric_items = "".join(f"<li>{line}</li>" for line in metric_lines + [
+        f"<b>Model Size:</b> {model_size_label()}",
+        f"<b>Inference Speed:</b> {speed_label}",
+    ])
+    
     with col1:
-        st.markdown("""
+        st.markdown(f"""
         <div style='background: rgba(20, 20, 20, 0.7); padding: 25px; border-radius: 16px;'>
             <h3 style='color: #f5c77a; margin-top: 0;'>📊 Model Specifications</h3>
             <ul style='color: rgba(245, 199, 122, 0.9); line-height: 2;'>
-                <li><b>Input Layer:</b> 11 Features</li>
-                <li><b>Hidden Layer 1:</b> 128 Neurons (ReLU)</li>
-                <li><b>Hidden Layer 2:</b> 64 Neurons (ReLU)</li>
-                <li><b>Hidden Layer 3:</b> 32 Neurons (ReLU)</li>
-                <li><b>Output Layer:</b> 1 Neuron (Linear)</li>
-                <li><b>Optimizer:</b> Adam (0.001)</li>
-                <li><b>Loss Function:</b> Mean Squared Error</li>
-                <li><b>Epochs:</b> 150 with Early Stopping</li>
+                {spec_items}
             </ul>
         </div>
         """, unsafe_allow_html=True)
     
     with col2:
-        st.markdown("""
+        st.markdown(f"""
         <div style='background: rgba(20, 20, 20, 0.7); padding: 25px; border-radius: 16px;'>
             <h3 style='color: #f5c77a; margin-top: 0;'>🎯 Performance Metrics</h3>
             <ul style='color: rgba(245, 199, 122, 0.9); line-height: 2;'>
-                <li><b>R² Score:</b> 0.942 ± 0.021</li>
-                <li><b>MAE:</b> 4.2 ± 0.8 points</li>
-                <li><b>RMSE:</b> 5.7 ± 1.1 points</li>
-                <li><b>Training Loss:</b> 0.0214</li>
-                <li><b>Validation Loss:</b> 0.0248</li>
-                <li><b>Training Time:</b> 8.4 minutes</li>
-                <li><b>Model Size:</b> 2.1 MB</li>
-                <li><b>Inference Speed:</b> < 0.2 seconds</li>
+                {metric_items}
             </ul>
         </div>
         """, unsafe_allow_html=True)
@@ -405,13 +720,26 @@ if page == "🏠 Dashboard":
 # SCORE PREDICTION PAGE
 # =============================
 elif page == "🎯 Score Prediction":
+    model, scaler, encoder, version = current_assets()
+    fingerprint = version['fingerprint'] if version else None
+    # Demo mode has no deployed schema to pair with; use the one on disk
+    encoder = encoder or ENCODER
+    mappings = encoder.mappings
+    prediction_cache = load_prediction_cache()
+    audit_log = load_audit_log()
+    try:
+        drift_monitor = load_drift_monitor(file_digest(DATA_PATH))
+    except (OSError, ValueError):
+        drift_monitor = None
+
     st.markdown("<div class='card'>", unsafe_allow_html=True)
     st.markdown("<h1>🎯 EXAM SCORE PREDICTION</h1>", unsafe_allow_html=True)
     
-    # Sidebar Inputs in columns
+    # Sidebar Inputs in columns. They sit in a form, so moving a slider
+    # doesn't rerun the page; everything below recomputes on submit.
     st.sidebar.markdown("<h3 style='color: #f5c77a;'>📝 Student Profile</h3>", unsafe_allow_html=True)
     
-    with st.sidebar:
+    with st.sidebar.form("student_profile", border=False):
         tab1, tab2 = st.tabs(["👤 Personal", "📚 Academic"])
         
         with tab1:
@@ -420,10 +748,10 @@ elif page == "🎯 Score Prediction":
             
             with col1:
                 age = st.number_input("Age", 15, 30, 20, help="Student's age in years")
-                gender = st.selectbox("Gender", list(MAPPINGS['gender'].keys()))
+                gender = st.selectbox("Gender", list(mappings['gender'].keys()))
             
             with col2:
-                course = st.selectbox("Course Type", list(MAPPINGS['course'].keys()))
+                course = st.selectbox("Course Type", list(mappings['course'].keys()))
                 internet = st.radio("Internet Access", ["yes", "no"], horizontal=True)
             st.markdown("</div>", unsafe_allow_html=True)
         
@@ -438,8 +766,8 @@ elif page == "🎯 Score Prediction":
                                       help="Percentage of classes attended")
             
             with col2:
-                study_method = st.selectbox("Study Method", list(MAPPINGS['study_method'].keys()))
-                difficulty = st.selectbox("Exam Difficulty", list(MAPPINGS['exam_difficulty'].keys()), index=2)
+                study_method = st.selectbox("Study Method", list(mappings['study_method'].keys()))
+                difficulty = st.selectbox("Exam Difficulty", list(mappings['exam_difficulty'].keys()), index=2)
             st.markdown("</div>", unsafe_allow_html=True)
             
             st.markdown("<div class='form-section'>", unsafe_allow_html=True)
@@ -450,35 +778,47 @@ elif page == "🎯 Score Prediction":
                 sleep_hours = st.slider("Sleep Hours", 4.0, 12.0, 7.5, 0.5,
                                        help="Average hours of sleep per night")
                 sleep_quality = st.select_slider("Sleep Quality", 
-                                               options=list(MAPPINGS['sleep_quality'].keys()), 
+                                               options=list(mappings['sleep_quality'].keys()), 
                                                value='good')
             
             with col4:
                 facility = st.select_slider("Facility Rating", 
-                                          options=list(MAPPINGS['facility_rating'].keys()), 
+                                          options=list(mappings['facility_rating'].keys()), 
                                           value='medium')
             st.markdown("</div>", unsafe_allow_html=True)
+        
+        predict_button = st.form_submit_button("🚀 GENERATE PREDICTION", use_container_width=True)
     
     # Prediction Logic
+    profile = {
+        'age': age,
+        'gender': gender,
+        'course': course,
+        'study_hours': study_hours,
+        'class_attendance': attendance,
+        'internet_access': internet,
+        'sleep_hours': sleep_hours,
+        'sleep_quality': sleep_quality,
+        'study_method': study_method,
+        'facility_rating': facility,
+        'exam_difficulty': difficulty
+    }
+    
     def get_prediction():
-        input_data = np.array([[
-            age, 
-            MAPPINGS['gender'][gender],
-            MAPPINGS['course'][course],
-            study_hours,
-            attendance,
-            MAPPINGS['internet_access'][internet],
-            sleep_hours,
-            MAPPINGS['sleep_quality'][sleep_quality],
-            MAPPINGS['study_method'][study_method],
-            MAPPINGS['facility_rating'][facility],
-            MAPPINGS['exam_difficulty'][difficulty]
-        ]])
-        
-        if scaler and model:
-            scaled_data = scaler.transform(input_data)
-            prediction = model.predict(scaled_data)[0][0]
-            return max(0, min(100, prediction))
+        start = time.perf_counter()
+        with telemetry.timed('encode'):
+            row = encoder.encode_profile(profile)
+
+        if model:
+            from scoring import predict_row
+            score = prediction_cache.get_or_compute(
+                tuple(row), fingerprint, lambda: predict_row(model, scaler, row)
+            )
+            if audit_log is not None:
+                audit_log.log(profile, score, fingerprint, (time.perf_counter() - start) * 1000)
+            if drift_monitor is not None:
+                drift_monitor.update(profile)
+            return score
         else:
             # Fallback prediction if model not loaded
             base_score = 65
@@ -509,18 +849,15 @@ elif page == "🎯 Score Prediction":
         df2 = pd.DataFrame(summary_data)
         st.dataframe(df2, use_container_width=True, hide_index=True)
     
-    # Prediction Button
-    col1, col2, col3 = st.columns([1, 2, 1])
-    with col2:
-        predict_button = st.button("🚀 GENERATE PREDICTION", use_container_width=True)
-    
+    # The submitted profile is kept with its score, so every section below
+    # describes the prediction shown rather than the current widget values
     if predict_button:
-        score = get_prediction()
-        st.session_state['score'] = score
+        st.session_state['prediction'] = {'profile': profile, 'score': get_prediction()}
     
     # Display Results
-    if 'score' in st.session_state:
-        score = st.session_state['score']
+    if 'prediction' in st.session_state:
+        profile = st.session_state['prediction']['profile']
+        score = st.session_state['prediction']['score']
         
         st.markdown("---")
         st.markdown("<h3>🎯 Prediction Results</h3>", unsafe_allow_html=True)
@@ -560,88 +897,123 @@ elif page == "🎯 Score Prediction":
             """, unsafe_allow_html=True)
         
         # Plotly Gauge Chart
-        fig = go.Figure(go.Indicator(
-            mode = "gauge+number+delta",
-            value = score,
-            title = {'text': "Academic Performance Score", 'font': {'color': '#f5c77a', 'size': 20}},
-            delta = {'reference': 50, 'increasing': {'color': "#22c55e"}},
-            domain = {'x': [0, 1], 'y': [0, 1]},
-            gauge = {
-                'axis': {'range': [0, 100], 'tickwidth': 1, 'tickcolor': '#f5c77a'},
-                'bar': {'color': color, 'thickness': 0.3},
-                'bgcolor': "rgba(0,0,0,0)",
-                'borderwidth': 2,
-                'bordercolor': "rgba(245, 199, 122, 0.3)",
-                'steps': [
-                    {'range': [0, 40], 'color': 'rgba(239, 68, 68, 0.3)'},
-                    {'range': [40, 70], 'color': 'rgba(245, 158, 11, 0.3)'},
-                    {'range': [70, 85], 'color': 'rgba(250, 204, 21, 0.3)'},
-                    {'range': [85, 100], 'color': 'rgba(34, 197, 94, 0.3)'}
-                ],
-                'threshold': {
-                    'line': {'color': "rgba(245, 199, 122, 0.8)", 'width': 4},
-                    'thickness': 0.75,
-                    'value': score
-                }
-            }
-        ))
+        gauge_start = time.perf_counter()
+        st.plotly_chart(gauge_figure(round(score, 1), color), use_container_width=True)
+        telemetry.record('gauge', time.perf_counter() - gauge_start)
         
-        fig.update_layout(
-            height=350,
-            margin=dict(l=50, r=50, t=80, b=50),
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font={'color': '#f5c77a'}
-        )
+        # Similar Students: real records closest to this profile
+        try:
+            neighbor_index = load_neighbor_index((file_digest(DATA_PATH), file_digest(SCALER_PATH)))
+        except (OSError, ImportError, ValueError):
+            neighbor_index = None
+        if neighbor_index is not None:
+            st.markdown("<h3>👥 Similar Students</h3>", unsafe_allow_html=True)
+            similar = neighbor_index.similar(profile, k=5)
+            st.markdown(f"<div style='color: rgba(245, 199, 122, 0.8);'>The 5 closest of {len(neighbor_index):,} real students in the dataset scored {similar['exam_score'].mean():.1f} on average.</div>", unsafe_allow_html=True)
+            similar_table = similar[['student_id'] + list(FEATURE_LABELS) + ['exam_score']].rename(
+                columns={**FEATURE_LABELS, 'student_id': 'Student', 'exam_score': 'Actual Score'}
+            )
+            st.dataframe(similar_table, use_container_width=True, hide_index=True)
         
-        st.plotly_chart(fig, use_container_width=True)
+        # What-If Analysis: every variant of the profile scored in one batch
+        recommendations = []
+        
+        if model:
+            from whatif import NUMERIC_SWEEPS, best_option, delta_at, impact_label
+            
+            base_score, curves, curve_fig, option_fig = whatif_figures(
+                fingerprint, tuple(profile.items()), color, model, scaler, encoder
+            )
+            
+            st.markdown("---")
+            st.markdown("<h3>📈 What-If Analysis</h3>", unsafe_allow_html=True)
+            st.plotly_chart(curve_fig, use_container_width=True)
+            st.plotly_chart(option_fig, use_container_width=True)
+            
+            # Score Heatmap: any two features, rest of the profile fixed.
+            # A fragment, so changing an axis reruns only this section.
+            @st.fragment
+            def score_heatmap_section():
+                from whatif import GRID_RANGES
+                st.markdown("<h3>🗺️ Score Heatmap</h3>", unsafe_allow_html=True)
+                grid_features = list(GRID_RANGES) + list(mappings)
+                col1, col2 = st.columns(2)
+                with col1:
+                    x_feature = st.selectbox("X axis", grid_features, index=grid_features.index('study_hours'),
+                                             format_func=FEATURE_LABELS.get)
+                with col2:
+                    y_options = [f for f in grid_features if f != x_feature]
+                    y_feature = st.selectbox("Y axis", y_options,
+                                             index=y_options.index('class_attendance') if 'class_attendance' in y_options else 0,
+                                             format_func=FEATURE_LABELS.get)
+                
+                heatmap_fig, grid_points, grid_seconds = heatmap_figure(
+                    fingerprint, tuple(profile.items()), x_feature, y_feature, model, scaler, encoder
+                )
+                st.plotly_chart(heatmap_fig, use_container_width=True)
+                st.caption(f"{grid_points:,} grid points scored in one batch ({grid_seconds * 1000:.1f} ms)")
+            
+            score_heatmap_section()
+            
+            # Recommendation deltas come straight from the sweep above
+            target_hours = min(profile['study_hours'] + 2, NUMERIC_SWEEPS['study_hours'][1])
+            delta = delta_at(curves, 'study_hours', target_hours)
+            if delta > 0.5:
+                recommendations.append({
+                    "icon": "📚",
+                    "title": "Increase Study Hours",
+                    "description": f"Current: {profile['study_hours']} hrs/day. Target: {target_hours} hrs/day. The model predicts {delta:+.1f} points.",
+                    "impact": impact_label(delta),
+                    "delta": delta
+                })
+            
+            if profile['class_attendance'] < 90:
+                delta = delta_at(curves, 'class_attendance', 90)
+                if delta > 0.5:
+                    recommendations.append({
+                        "icon": "🎓",
+                        "title": "Improve Attendance",
+                        "description": f"Current: {profile['class_attendance']}%. Target: 90%+. The model predicts {delta:+.1f} points at 90% attendance.",
+                        "impact": impact_label(delta),
+                        "delta": delta
+                    })
+            
+            best_sleep, delta = best_option(curves, 'sleep_hours', 7, 9)
+            if delta > 0.5:
+                recommendations.append({
+                    "icon": "😴",
+                    "title": "Optimize Sleep",
+                    "description": f"Current: {profile['sleep_hours']} hrs. Within the healthy 7-9 hr range, {best_sleep} hrs scores best ({delta:+.1f} points).",
+                    "impact": impact_label(delta),
+                    "delta": delta
+                })
+            
+            best_quality, delta = best_option(curves, 'sleep_quality')
+            if best_quality != profile['sleep_quality'] and delta > 0.5:
+                recommendations.append({
+                    "icon": "✨",
+                    "title": "Enhance Sleep Quality",
+                    "description": f"Moving from {profile['sleep_quality']} to {best_quality} sleep is worth {delta:+.1f} points. Consider sleep hygiene practices: consistent schedule, dark room, no screens before bed.",
+                    "impact": impact_label(delta),
+                    "delta": delta
+                })
+            
+            best_method, delta = best_option(curves, 'study_method')
+            if best_method != profile['study_method'] and delta > 0.5:
+                recommendations.append({
+                    "icon": "👥",
+                    "title": "Diversify Study Methods",
+                    "description": f"Switching from {profile['study_method']} to {best_method} is predicted to add {delta:+.1f} points.",
+                    "impact": impact_label(delta),
+                    "delta": delta
+                })
+            
+            recommendations.sort(key=lambda r: r['delta'], reverse=True)
         
         # Recommendations
         st.markdown("---")
         st.markdown("<h3>💡 Personalized Recommendations</h3>", unsafe_allow_html=True)
         
-        recommendations = []
-        
-        if score < 70:
-            recommendations.append({
-                "icon": "📚",
-                "title": "Increase Study Hours",
-                "description": f"Current: {study_hours} hrs/day. Target: {study_hours + 2} hrs/day. This could improve your score by approximately {(study_hours + 2 - study_hours) * 2:.1f} points.",
-                "impact": "Medium-High"
-            })
-        
-        if attendance < 85:
-            recommendations.append({
-                "icon": "🎓",
-                "title": "Improve Attendance",
-                "description": f"Current: {attendance}%. Target: 90%+. Each 5% increase in attendance correlates with ~1 point improvement.",
-                "impact": "High"
-            })
-        
-        if sleep_hours < 7:
-            recommendations.append({
-                "icon": "😴",
-                "title": "Optimize Sleep",
-                "description": f"Current: {sleep_hours} hrs. Target: 7-9 hrs. Adequate sleep improves memory retention by up to 25%.",
-                "impact": "Medium"
-            })
-        
-        if sleep_quality == 'poor' or sleep_quality == 'average':
-            recommendations.append({
-                "icon": "✨",
-                "title": "Enhance Sleep Quality",
-                "description": "Consider sleep hygiene practices: consistent schedule, dark room, no screens before bed.",
-                "impact": "Medium"
-            })
-        
-        if study_method in ['self-study'] and score < 75:
-            recommendations.append({
-                "icon": "👥",
-                "title": "Diversify Study Methods",
-                "description": f"Consider adding group study or online resources to complement self-study.",
-                "impact": "Medium"
-            })
-        
         # Display recommendations in columns
         if recommendations:
             cols = st.columns(2)
@@ -659,8 +1031,97 @@ elif page == "🎯 Score Prediction":
                         </div>
                     </div>
                     """, unsafe_allow_html=True)
+        elif not model:
+            st.info("Recommendations are based on the trained model and are unavailable in demo mode.")
         else:
             st.success("🎉 Your current study habits are optimal! Maintain your routine for continued success.")
+        
+        # Target Score Planner. A fragment: the slider and button rerun
+        # only this section, not the results above it.
+        if model:
+            @st.fragment
+            def target_planner():
+                st.markdown("---")
+                st.markdown("<h3>🧭 Target Score Planner</h3>", unsafe_allow_html=True)
+                st.markdown("<div style='color: rgba(245, 199, 122, 0.8);'>Smallest change to study hours, attendance, sleep or study method that reaches a target score.</div>", unsafe_allow_html=True)
+                
+                col1, col2 = st.columns([2, 1])
+                with col1:
+                    target = st.slider("Target Score", 0, 100, int(min(100, max(70, score + 10))), 1)
+                with col2:
+                    st.markdown("<div style='height: 28px;'></div>", unsafe_allow_html=True)
+                    plan_button = st.button("🧭 FIND PLAN", use_container_width=True)
+                
+                if plan_button:
+                    from planner import plan_changes
+                    result = plan_changes(profile, target, model, scaler, encoder=encoder)
+                    
+                    if result['reached'] and result['plans'] and not result['plans'][0]['changes']:
+                        st.success(f"🎉 Your current profile already reaches {target}.")
+                    elif result['plans']:
+                        if not result['reached'] and result['timed_out']:
+                            st.warning(f"⏳ No plan reaching {target} found within the search budget. Best found:")
+                        elif not result['reached']:
+                            st.warning(f"⚠️ {target} isn't reachable by changing these features alone. Best found:")
+                        plan_rows = []
+                        for plan in result['plans']:
+                            changes = ", ".join(
+                                f"{FEATURE_LABELS[f]}: {old} → {new}" for f, (old, new) in plan['changes'].items()
+                            )
+                            plan_rows.append({"Changes": changes, "Effort": plan['cost'], "Predicted": round(plan['score'], 1)})
+                        st.dataframe(pd.DataFrame(plan_rows), use_container_width=True, hide_index=True)
+                    st.caption(f"{result['evaluated']:,} candidates evaluated in {result['seconds'] * 1000:.0f} ms")
+            
+            target_planner()
+    
+    # Bulk CSV Scoring (a fragment, so uploads and downloads leave the
+    # rest of the page alone)
+    @st.fragment
+    def bulk_scoring():
+        st.markdown("---")
+        st.markdown("<h3>📁 Bulk CSV Scoring</h3>", unsafe_allow_html=True)
+        st.markdown("<div style='color: rgba(245, 199, 122, 0.8);'>Score a whole class at once. Upload a CSV with the same columns as Exam_Score_Prediction.csv.</div>", unsafe_allow_html=True)
+        
+        uploaded = st.file_uploader("Student CSV", type=['csv'], label_visibility="collapsed")
+        
+        if uploaded is not None:
+            add_similar = st.checkbox("Add similar-student scores (mean actual score of the 5 closest students in the dataset)")
+            if not model:
+                st.warning("⚠️ Bulk scoring needs the trained model.")
+            elif st.button("⚡ SCORE FILE", use_container_width=True):
+                from scoring import score_csv
+                
+                progress = st.progress(0.0, text="Scoring...")
+                
+                def report_progress(rows):
+                    done = min(uploaded.tell() / max(uploaded.size, 1), 1.0)
+                    progress.progress(done, text=f"Scored {rows:,} rows")
+                
+                output = io.BytesIO()
+                try:
+                    neighbor_index = None
+                    if add_similar:
+                        neighbor_index = load_neighbor_index((file_digest(DATA_PATH), file_digest(SCALER_PATH)))
+                    rows = score_csv(uploaded, output, model, scaler, on_progress=report_progress, encoder=encoder, neighbors=neighbor_index)
+                    progress.progress(1.0, text=f"Scored {rows:,} rows")
+                    st.session_state['bulk_result'] = (uploaded.name, output.getvalue(), rows)
+                except ValueError as e:
+                    progress.empty()
+                    st.error(f"Could not score file: {e}")
+        
+        if 'bulk_result' in st.session_state:
+            name, data, rows = st.session_state['bulk_result']
+            st.success(f"✅ {rows:,} students scored from {name}")
+            st.dataframe(pd.read_csv(io.BytesIO(data), nrows=10), use_container_width=True, hide_index=True)
+            st.download_button(
+                "⬇️ DOWNLOAD SCORED CSV",
+                data=data,
+                file_name=name.rsplit('.', 1)[0] + "_scored.csv",
+                mime="text/csv",
+                use_container_width=True
+            )
+    
+    bulk_scoring()
     
     st.markdown("</div>", unsafe_allow_html=True)
 
@@ -668,47 +1129,44 @@ elif page == "🎯 Score Prediction":
 # ANALYTICS PAGE - FIXED SECTION
 # =============================
 elif page == "📊 Analytics":
+    import plotly.graph_objects as go
+    from analytics import DIMENSIONS, DIMENSION_LABELS, derive_insights, pivot_slice, slice_cube
+    
+    cube = load_analytics_cube(file_digest(DATA_PATH))
+    
+    def category_stats(dim, label):
+        stats = slice_cube(cube, dim).sort_values('mean', ascending=False)
+        return pd.DataFrame({
+            label: stats['value'].str.title(),
+            'Avg Score': stats['mean'].round(1),
+            'Students': stats['count']
+        })
+
     st.markdown("<div class='card'>", unsafe_allow_html=True)
     st.markdown("<h1>📊 PERFORMANCE ANALYTICS</h1>", unsafe_allow_html=True)
     
     # Feature Importance
     st.markdown("<h3>📈 Feature Impact Analysis</h3>", unsafe_allow_html=True)
     
-    features = ['Study Hours', 'Attendance', 'Sleep Hours', 'Sleep Quality', 
-                'Course Type', 'Study Method', 'Internet Access', 'Facility Rating', 
-                'Exam Difficulty', 'Age', 'Gender']
-    importance = [28.5, 22.3, 15.8, 12.4, 8.2, 5.6, 3.4, 2.1, 1.5, 0.8, 0.4]
-    
-    # Create horizontal bar chart with FIXED colorscale
-    fig = go.Figure()
-    
-    fig.add_trace(go.Bar(
-        y=features,
-        x=importance,
-        orientation='h',
-        marker=dict(
-            color=importance,
-            colorscale='YlOrBr',  # Changed from 'gold' to valid Plotly colorscale
-            showscale=True,
-            colorbar=dict(title="Importance %")
-        ),
-        text=[f'{x:.1f}%' for x in importance],
-        textposition='outside'
-    ))
-    
-    fig.update_layout(
-        title="Feature Importance in Score Prediction",
-        xaxis_title="Importance (%)",
-        yaxis_title="Features",
-        height=500,
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='#f5c77a'),
-        xaxis=dict(showgrid=True, gridcolor='rgba(245, 199, 122, 0.1)'),
-        yaxis=dict(showgrid=False)
-    )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    # Permutation importance of the deployed model, read from the on-disk
+    # cache (python importance.py fills it; keyed by model + data hash)
+    from importance import cached_importance, compute_importance
+    
+    result = cached_importance()
+    if result is None:
+        st.info("Feature importance hasn't been computed for the current model and dataset yet.")
+        if st.button("⚡ COMPUTE FEATURE IMPORTANCE", use_container_width=True):
+            with st.spinner("Running permutation importance..."):
+                result = compute_importance()
+    
+    if result is not None:
+        ranked = sorted(zip(result['features'], result['importance_pct']), key=lambda r: r[1])
+        features = tuple(FEATURE_LABELS[f] for f, _ in ranked)
+        importance = tuple(pct for _, pct in ranked)
+
+        # Horizontal bar chart, built once per importance result
+        fig = importance_figure(features, importance, result['n_repeats'])
+        st.plotly_chart(fig, use_container_width=True)
     
     # Statistics by Category
     st.markdown("<h3>📊 Performance Statistics</h3>", unsafe_allow_html=True)
@@ -718,30 +1176,21 @@ elif page == "📊 Analytics":
     with col1:
         st.markdown("<div class='card'>", unsafe_allow_html=True)
         st.markdown("##### 📚 By Study Method")
-        method_stats = pd.DataFrame({
-            'Method': ['Coaching', 'Group Study', 'Self-Study', 'Online', 'Mixed'],
-            'Avg Score': [78.2, 75.6, 72.4, 70.8, 74.3]
-        })
+        method_stats = category_stats('study_method', 'Method')
         st.dataframe(method_stats, use_container_width=True, hide_index=True)
         st.markdown("</div>", unsafe_allow_html=True)
     
     with col2:
         st.markdown("<div class='card'>", unsafe_allow_html=True)
         st.markdown("##### 💤 By Sleep Quality")
-        sleep_stats = pd.DataFrame({
-            'Quality': ['Good', 'Average', 'Poor'],
-            'Avg Score': [76.5, 68.2, 62.1]
-        })
+        sleep_stats = category_stats('sleep_quality', 'Quality')
         st.dataframe(sleep_stats, use_container_width=True, hide_index=True)
         st.markdown("</div>", unsafe_allow_html=True)
     
     with col3:
         st.markdown("<div class='card'>", unsafe_allow_html=True)
         st.markdown("##### 🎓 By Course Type")
-        course_stats = pd.DataFrame({
-            'Course': ['B.Tech', 'B.Sc', 'B.Com', 'BCA', 'BBA'],
-            'Avg Score': [74.8, 72.3, 70.5, 69.2, 71.6]
-        })
+        course_stats = category_stats('course', 'Course')
         st.dataframe(course_stats, use_container_width=True, hide_index=True)
         st.markdown("</div>", unsafe_allow_html=True)
     
@@ -749,19 +1198,50 @@ elif page == "📊 Analytics":
     st.markdown("<div class='card'>", unsafe_allow_html=True)
     st.markdown("<h4>🔍 Key Insights</h4>", unsafe_allow_html=True)
     
-    insights = [
-        "• Study Hours show diminishing returns after 8 hours/day",
-        "• Attendance above 85% has strongest correlation with high scores",
-        "• Sleep quality impacts scores more than sleep quantity",
-        "• Group study yields 3 to 5% better results than solo study",
-        "• Internet access improves scores by 4-7% on average"
-    ]
+    insights = derive_insights(cube)
     
     for insight in insights:
         st.markdown(f"<div style='color: rgba(245, 199, 122, 0.9); margin: 10px 0;'>{insight}</div>", unsafe_allow_html=True)
     
     st.markdown("</div>", unsafe_allow_html=True)
     
+    # Two-way slice explorer
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("<h4>🧊 Two-Way Breakdown</h4>", unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        row_dim = st.selectbox("Rows", DIMENSIONS, index=DIMENSIONS.index('study_method'),
+                               format_func=DIMENSION_LABELS.get)
+    with col2:
+        col_dim = st.selectbox("Columns", DIMENSIONS, index=DIMENSIONS.index('sleep_quality'),
+                               format_func=DIMENSION_LABELS.get)
+    
+    if row_dim == col_dim:
+        st.dataframe(slice_cube(cube, row_dim).round(1), use_container_width=True, hide_index=True)
+    else:
+        grid = pivot_slice(cube, row_dim, col_dim)
+        heat = go.Figure(go.Heatmap(
+            z=grid.values,
+            x=list(grid.columns),
+            y=list(grid.index),
+            colorscale='YlOrBr',
+            text=np.round(grid.values, 1),
+            texttemplate="%{text}",
+            colorbar=dict(title="Avg Score")
+        ))
+        heat.update_layout(
+            height=400,
+            xaxis_title=DIMENSION_LABELS[col_dim],
+            yaxis_title=DIMENSION_LABELS[row_dim],
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font=dict(color='#f5c77a')
+        )
+        st.plotly_chart(heat, use_container_width=True)
+    
+    st.markdown("</div>", unsafe_allow_html=True)
+    
     st.markdown("</div>", unsafe_allow_html=True)
 
 # =============================
@@ -778,22 +1258,35 @@ elif page == "⚙️ System":
         st.markdown("### 🚀 Deployment Specifications")
         st.markdown("""
         **Framework:** Streamlit Cloud  
-        **ML Framework:** TensorFlow 2.x  
+        **ML Framework:** TensorFlow 2.x (training)  
+        **Inference:** NumPy forward pass (TensorFlow optional)  
         **Neural Network:** 3-Layer Dense  
         **Visualization:** Plotly Interactive  
         **Styling:** Custom CSS3  
         **Hosting:** Streamlit Community Cloud
         """)
         
-        if model:
-            st.success("✅ Model: Loaded Successfully")
-        else:
-            st.warning("⚠️ Model: Demo Mode Active")
-        
-        if scaler:
-            st.success("✅ Scaler: Loaded Successfully")
+        manager = model_manager()
+        if manager.status()['active']:
+            manager.poll()
+        reload_status = manager.status()
+        active = reload_status['active']
+        if active:
+            st.success(f"✅ Model: Version {active['fingerprint']} active ({INFERENCE_BACKEND} backend)")
+            st.caption(f"Loaded {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(active['loaded_at']))} "
+                       f"in {active['load_seconds']:.2f}s + {active['warmup_seconds'] * 1000:.0f} ms warm-up; "
+                       f"{reload_status['swaps']} version(s) loaded by this process")
+            if active['scaler_folded']:
+                st.success("✅ Scaler: Folded into the model's first layer (scikit-learn not loaded)")
+            else:
+                st.success("✅ Scaler: Loaded Successfully")
         else:
-            st.warning("⚠️ Scaler: Not Loaded")
+            st.info("⏳ Model: Loads on first visit to Score Prediction")
+            st.info("⏳ Scaler: Loads on first visit to Score Prediction")
+        if reload_status['pending']:
+            st.info(f"🔄 New version {reload_status['pending']} is loading in the background")
+        if reload_status['last_error']:
+            st.warning(f"⚠️ Reload of {reload_status['last_error']['fingerprint']} failed: {reload_status['last_error']['error']}")
         
         st.markdown("</div>", unsafe_allow_html=True)
         
@@ -804,7 +1297,7 @@ elif page == "⚙️ System":
         **Records:** 20,000+ student profiles  
         **Features:** 11 predictive variables  
         **Target:** Exam Score (0-100)  
-        **Split:** 80% Training, 20% Testing  
+        **Split:** 67% Training (30% of it for validation), 33% Testing  
         **Preprocessing:** Standard Scaling + Encoding
         """)
         st.markdown("</div>", unsafe_allow_html=True)
@@ -812,17 +1305,70 @@ elif page == "⚙️ System":
     with col2:
         st.markdown("<div class='card'>", unsafe_allow_html=True)
         st.markdown("### 🤖 Model Architecture")
-        st.markdown("""
-        **Type:** Deep Neural Network  
-        **Layers:** 3 Hidden + 1 Output  
-        **Neurons:** 128 → 64 → 32 → 1  
-        **Activation:** ReLU (Hidden), Linear (Output)  
-        **Optimizer:** Adam (lr=0.001)  
-        **Loss:** Mean Squared Error  
-        **Epochs:** 150 with Early Stopping
-        """)
-        st.metric("Model Size", "2.1 MB")
-        st.metric("Training Time", "8.4 mins")
+        card = load_model_card()
+        if card:
+            st.markdown("  \n".join(line.replace("<b>", "**").replace("</b>", "**") for line in architecture_lines(card)))
+            st.metric("Model Size", model_size_label(), f"{card['parameters']:,} parameters", delta_color="off")
+        else:
+            st.info("Not measured for the deployed model yet. Run `python evaluate.py card`.")
+            st.metric("Model Size", model_size_label())
+        st.markdown("</div>", unsafe_allow_html=True)
+        
+        st.markdown("<div class='card'>", unsafe_allow_html=True)
+        st.markdown("### 🎯 Measured Accuracy")
+        if card:
+            holdout = card['holdout']
+            rows = [{"Evaluation": f"Holdout ({holdout['rows']:,} rows)", "R²": round(holdout['r2'], 4),
+                     "MAE": round(holdout['mae'], 3), "RMSE": round(holdout['rmse'], 3)}]
+            cv = card['cross_validation']
+            if cv:
+                rows.append({"Evaluation": f"{cv['k']}-fold CV (mean ± std)",
+                             "R²": f"{cv['r2']['mean']:.4f} ± {cv['r2']['std']:.4f}",
+                             "MAE": f"{cv['mae']['mean']:.3f} ± {cv['mae']['std']:.3f}",
+                             "RMSE": f"{cv['rmse']['mean']:.3f} ± {cv['rmse']['std']:.3f}"})
+            st.dataframe(pd.DataFrame(rows).astype(str), use_container_width=True, hide_index=True)
+            st.caption(f"Measured {time.strftime('%Y-%m-%d %H:%M', time.localtime(card['measured_at']))} for artifacts {card['fingerprint']}")
+        else:
+            st.info("No measurements for the deployed model. Run `python evaluate.py card`.")
+        
+        from evaluate import SEARCH_RESULTS_PATH, config_label, load_json
+        search = load_json(SEARCH_RESULTS_PATH)
+        if search and search['results']:
+            st.markdown("##### Hyperparameter Search (best first)")
+            st.dataframe(pd.DataFrame([{
+                "Config": config_label(r['config']),
+                "R²": round(r['r2']['mean'], 4),
+                "MAE": round(r['mae']['mean'], 3),
+                "RMSE": round(r['rmse']['mean'], 3),
+                "Epochs": round(r['epochs_run'], 1),
+            } for r in search['results'][:5]]), use_container_width=True, hide_index=True)
+            st.caption(f"{search['k']}-fold CV, up to {search['epochs']} epochs per trial")
+        st.markdown("</div>", unsafe_allow_html=True)
+        
+        st.markdown("<div class='card'>", unsafe_allow_html=True)
+        st.markdown("### 📏 Last Benchmark")
+        bench = load_benchmark()
+        if bench:
+            m = bench['metrics']
+            c1, c2 = st.columns(2)
+            c1.metric("Startup", f"{m['startup_s']:.2f}s" if m.get('startup_s') is not None else "—")
+            c2.metric("Load Assets", f"{m['load_assets_s']:.2f}s")
+            c1.metric("Prediction p50 / p99", f"{m['single_row_p50_ms']:.2f} / {m['single_row_p99_ms']:.2f} ms")
+            c2.metric("Peak Memory", f"{m['peak_rss_mb']:.0f} MB")
+            st.dataframe(pd.DataFrame({
+                'Batch Size': [int(size) for size in bench['batch']],
+                'Rows/sec': [b['rows_per_sec'] for b in bench['batch'].values()],
+                'ms/Batch': [b['ms_per_batch'] for b in bench['batch'].values()]
+            }), use_container_width=True, hide_index=True)
+            failed = [c['metric'] for c in bench['checks'] if not c['passed']]
+            if failed:
+                st.warning(f"⚠️ Regression thresholds exceeded: {', '.join(failed)}")
+            else:
+                st.success("✅ All regression thresholds met")
+            st.caption(f"Measured {time.strftime('%Y-%m-%d %H:%M', time.localtime(bench['timestamp']))} "
+                       f"on {bench['cpus']} CPUs, Python {bench['python']}")
+        else:
+            st.info("No benchmark recorded yet. Run `python benchmark.py`.")
         st.markdown("</div>", unsafe_allow_html=True)
         
         st.markdown("<div class='card'>", unsafe_allow_html=True)
@@ -836,6 +1382,84 @@ elif page == "⚙️ System":
         ✅ **Professional UI/UX** - Premium gold/black theme
         """)
         st.markdown("</div>", unsafe_allow_html=True)
+        
+        st.markdown("<div class='card'>", unsafe_allow_html=True)
+        st.markdown("### ⏱️ First Render per Page (this process)")
+        cold_starts = cold_start_times()
+        if cold_starts:
+            st.dataframe(pd.DataFrame({
+                'Page': list(cold_starts.keys()),
+                'First Render (s)': [round(v, 3) for v in cold_starts.values()]
+            }), use_container_width=True, hide_index=True)
+            st.caption("Only the first page visited includes module imports; later pages reuse them.")
+        st.markdown("</div>", unsafe_allow_html=True)
+        
+        st.markdown("<div class='card'>", unsafe_allow_html=True)
+        st.markdown("### 🔬 Live Stage Latency")
+        stages = telemetry.snapshot()
+        if stages:
+            st.dataframe(pd.DataFrame({
+                'Stage': list(stages.keys()),
+                'Samples': [s['count'] for s in stages.values()],
+                'p50 (ms)': [round(s['p50_ms'], 3) for s in stages.values()],
+                'p95 (ms)': [round(s['p95_ms'], 3) for s in stages.values()],
+                'p99 (ms)': [round(s['p99_ms'], 3) for s in stages.values()],
+                'Max (ms)': [round(s['max_ms'], 3) for s in stages.values()]
+            }), use_container_width=True, hide_index=True)
+            st.caption(f"Last {telemetry.RING_SIZE:,} samples per stage · exported to {telemetry.METRICS_FILE}")
+        st.markdown("</div>", unsafe_allow_html=True)
+        
+        st.markdown("<div class='card'>", unsafe_allow_html=True)
+        st.markdown("### 🗃️ Prediction Cache")
+        cache_stats = load_prediction_cache().stats()
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Hit Rate", f"{cache_stats['hit_rate']:.0%}")
+        c2.metric("Hits", f"{cache_stats['memory_hits'] + cache_stats['disk_hits']:,}",
+                  f"{cache_stats['disk_hits']:,} from disk", delta_color="off")
+        c3.metric("Misses", f"{cache_stats['misses']:,}")
+        st.caption(f"{cache_stats['size']:,} / {cache_stats['maxsize']:,} entries · "
+                   f"{cache_stats['evictions']:,} evictions · "
+                   f"disk tier: {cache_stats['disk_tier'] or 'off'}")
+        st.markdown("</div>", unsafe_allow_html=True)
+        
+        audit_log = load_audit_log()
+        if audit_log is not None:
+            from audit import daily_aggregates
+            st.markdown("<div class='card'>", unsafe_allow_html=True)
+            st.markdown("### 🧾 Prediction Audit Log")
+            audit_stats = audit_log.stats()
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("Logged", f"{audit_stats['logged']:,}")
+            c2.metric("Written", f"{audit_stats['written']:,}")
+            c3.metric("Pending", f"{audit_stats['pending']:,}")
+            c4.metric("Dropped", f"{audit_stats['dropped']:,}")
+            daily = daily_aggregates(audit_log.path, days=14)
+            if daily:
+                st.dataframe(pd.DataFrame(daily).round(3), hide_index=True, use_container_width=True)
+            st.caption(f"{audit_log.path} · policy: {audit_stats['policy']} · "
+                       f"queue limit {audit_stats['max_pending']:,} · {audit_stats['errors']:,} write errors")
+            st.markdown("</div>", unsafe_allow_html=True)
+        
+        # Input drift: served profiles vs the training CSV
+        try:
+            drift_monitor = load_drift_monitor(file_digest(DATA_PATH))
+        except (OSError, ValueError):
+            drift_monitor = None
+        if drift_monitor is not None:
+            st.markdown("<div class='card'>", unsafe_allow_html=True)
+            st.markdown("### 📉 Input Drift")
+            drift_scores = drift_monitor.scores()
+            status_icons = {'stable': '🟢 Stable', 'moderate': '🟡 Moderate', 'major': '🔴 Major', 'collecting': '⏳ Collecting'}
+            st.dataframe(pd.DataFrame({
+                'Feature': [FEATURE_LABELS[f] for f in drift_scores],
+                'PSI': [None if s['psi'] is None else round(s['psi'], 3) for s in drift_scores.values()],
+                'KS': [None if s['ks'] is None else round(s['ks'], 3) for s in drift_scores.values()],
+                'Status': [status_icons[s['status']] for s in drift_scores.values()]
+            }), use_container_width=True, hide_index=True)
+            st.caption(f"{drift_monitor.observed:,} predictions observed · "
+                       f"~{drift_monitor.effective_samples():,.0f} in the window (half-life {drift_monitor.half_life:,}) · "
+                       f"scores shown from {drift_monitor.min_samples} · PSI < 0.1 stable, > 0.25 major")
+            st.markdown("</div>", unsafe_allow_html=True)
     
     st.markdown("---")
     
@@ -852,4 +1476,8 @@ elif page == "⚙️ System":
 st.markdown(
     "<div class='footer'>Trymore Mhlanga Analytics | Academic Intelligence Platform © 2026</div>",
     unsafe_allow_html=True
-)
\ No newline at end of file
+)
+
+record_cold_start(page, time.perf_counter() - _script_start)
+telemetry.record('rerun', time.perf_counter() - _script_start)
+telemetry.export()
\ No newline at end of file
@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+# =============================
+# HOT-PATH STAGE TIMINGS
+# =============================
+# One fixed-size ring buffer per stage: recording is an index bump and an
+# array write, and memory never grows past RING_SIZE samples per stage.
+RING_SIZE = 2048
+METRICS_FILE = os.environ.get('EXAM_METRICS_FILE', 'metrics.prom')
+EXPORT_INTERVAL = 5.0
+
+# Stages in display order
+STAGES = ['rerun', 'encode', 'scale', 'predict', 'gauge']
+
+
+class StageHistogram:
+    def __init__(self, size=RING_SIZE):
+        self.samples = np.zeros(size)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds):
+        self.samples[self.count % len(self.samples)] = seconds
+        self.count += 1
+        self.total += seconds
+
+    def window(self):
+        return self.samples[:min(self.count, len(self.samples))]
+
+
+_histograms = {}
+_lock = threading.Lock()
+_last_export = 0.0
+
+
+def record(stage, seconds):
+    with _lock:
+        hist = _histograms.get(stage)
+        if hist is None:
+            hist = _histograms[stage] = StageHistogram()
+        hist.record(seconds)
+
+
+@contextmanager
+def timed(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start)
+
+
+def snapshot():
+    # {stage: {count, p50_ms, p95_ms, p99_ms, max_ms}} over each ring's window
+    with _lock:
+        windows = {stage: (hist.count, hist.total, hist.window().copy()) for stage, hist in _histograms.items()}
+
+    order = {stage: i for i, stage in enumerate(STAGES)}
+    result = {}
+    for stage in sorted(windows, key=lambda s: order.get(s, len(order))):
+        count, total, window = windows[stage]
+        p50, p95, p99 = np.percentile(window, [50, 95, 99]) * 1000
+        result[stage] = {
+            'count': count,
+            'sum_s': total,
+            'p50_ms': p50,
+            'p95_ms': p95,
+            'p99_ms': p99,
+            'max_ms': window.max() * 1000,
+        }
+    return result
+
+
+def prometheus_text():
+    lines = [
+        '# HELP exam_stage_seconds Prediction flow stage latency (recent window)',
+        '# TYPE exam_stage_seconds summary',
+    ]
+    for stage, s in snapshot().items():
+        for q, key in (('0.5', 'p50_ms'), ('0.95', 'p95_ms'), ('0.99', 'p99_ms')):
+            lines.append(f'exam_stage_seconds{{stage="{stage}",quantile="{q}"}} {s[key] / 1000:.6f}')
+        lines.append(f'exam_stage_seconds_sum{{stage="{stage}"}} {s["sum_s"]:.6f}')
+        lines.append(f'exam_stage_seconds_count{{stage="{stage}"}} {s["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+def export(path=METRICS_FILE, force=False):
+    # Throttled file export for node_exporter's textfile collector or similar
+    global _last_export
+    now = time.time()
+    if not force and now - _last_export < EXPORT_INTERVAL:
+        return
+    _last_export = now
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, 'w') as f:
+            f.write(prometheus_text())
+        os.replace(tmp, path)
+    except OSError:
+        pass
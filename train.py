@@ -0,0 +1,430 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from artifacts import DATA_PATH, FOLDED_MODEL_PATH, MODEL_PATH, SCALER_PATH, SCHEMA_PATH, artifact_fingerprint, file_digest
+from dataset import iter_chunks, open_store, read_dataset
+from features import ENCODER, FEATURE_COLUMNS, encode_frame
+
+# =============================
+# TRAINING PIPELINE
+# =============================
+# Scripted version of Exam_Score.ipynb:
+#   1. stream the CSV in chunks, encode with the persisted feature schema
+#      (unknown categories are an error, not a new code); test rows are the
+#      notebook holdout (holdout_split), the rest go to train/val
+#      with a seeded RNG; partial_fit the scaler on train rows only;
+#      encoded rows are appended to flat float32 files on disk
+#   2. tf.data reads those files back as memory-mapped batches with
+#      parallel map + prefetch, scaling on the fly
+#   3. train the same 11-64-32-1 network and write a versioned artifact set
+#      (exam_model.h5, scaler.pkl, schema.json, metrics.json)
+TARGET = 'exam_score'
+ARTIFACT_ROOT = os.environ.get('EXAM_ARTIFACT_ROOT', 'artifacts')
+N_COLS = len(FEATURE_COLUMNS) + 1
+
+
+def default_threads():
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def holdout_split(n_rows, seed=42, test_size=0.33):
+    # (train, test) row indices of the notebook split over the first n_rows
+    return train_test_split(np.arange(n_rows), test_size=test_size, random_state=seed)
+
+
+def split_to_disk(data_path, workdir, test_size=0.33, val_size=0.3, seed=42, chunksize=100_000):
+    # val_size is a fraction of the non-test rows, like validation_split in the notebook.
+    # The test rows are the notebook holdout, the same unseen set evaluate.py,
+    # export.py and the model card score on
+    n_rows = open_store(data_path)[0]['rows']
+    held_out = np.zeros(n_rows, dtype=bool)
+    held_out[holdout_split(n_rows, test_size=test_size)[1]] = True
+    scaler = StandardScaler()
+    files = {name: open(os.path.join(workdir, f"{name}.f32"), 'wb') for name in ('train', 'val', 'test')}
+    counts = dict.fromkeys(files, 0)
+    try:
+        for i, chunk in enumerate(iter_chunks(data_path, FEATURE_COLUMNS + [TARGET], chunksize)):
+            features = encode_frame(chunk)
+            block = np.column_stack([features.to_numpy(dtype=np.float32), chunk[TARGET].to_numpy(dtype=np.float32)])
+
+            is_test = held_out[chunk.index]
+            u = np.random.default_rng([seed, i]).random(len(chunk))
+            is_val = ~is_test & (u < val_size)
+            is_train = ~is_test & ~is_val
+
+            if is_train.any():
+                scaler.partial_fit(features[is_train])
+            for name, mask in (('train', is_train), ('val', is_val), ('test', is_test)):
+                files[name].write(block[mask].tobytes())
+                counts[name] += int(mask.sum())
+    finally:
+        for f in files.values():
+            f.close()
+
+    arrays = {
+        name: np.memmap(os.path.join(workdir, f"{name}.f32"), dtype=np.float32, mode='r', shape=(counts[name], N_COLS))
+        for name in files
+    }
+    return arrays, scaler, np.flatnonzero(held_out)
+
+
+def make_dataset(rows, scaler, batch_size, shuffle=False, seed=42):
+    import tensorflow as tf
+
+    mean = scaler.mean_.astype(np.float32)
+    scale = scaler.scale_.astype(np.float32)
+    n_batches = -(-len(rows) // batch_size)
+
+    def load(i):
+        block = np.asarray(rows[i * batch_size:(i + 1) * batch_size])
+        return (block[:, :-1] - mean) / scale, block[:, -1:]
+
+    ds = tf.data.Dataset.range(n_batches)
+    if shuffle:
+        # Batch-order shuffle; rows in the source CSV are already in random order
+        ds = ds.shuffle(n_batches, seed=seed, reshuffle_each_iteration=True)
+    ds = ds.map(lambda i: tf.numpy_function(load, [i], (tf.float32, tf.float32)),
+                num_parallel_calls=tf.data.AUTOTUNE, deterministic=not shuffle)
+    ds = ds.map(lambda x, y: (tf.ensure_shape(x, [None, len(FEATURE_COLUMNS)]), tf.ensure_shape(y, [None, 1])))
+    return ds.prefetch(tf.data.AUTOTUNE)
+
+
+def build_model(hidden=(64, 32), dropout=0.2, learning_rate=0.001):
+    import tensorflow as tf
+    from tensorflow.keras.layers import Dense, Dropout, Input
+
+    model = tf.keras.Sequential([Input(shape=(len(FEATURE_COLUMNS),)), Dense(len(FEATURE_COLUMNS), activation='relu')])
+    for units in hidden:
+        model.add(Dense(units, activation='relu'))
+    model.add(Dropout(dropout))
+    model.add(Dense(1, activation='linear'))
+    model.compile(loss='mean_squared_error', optimizer=tf.keras.optimizers.Adam(learning_rate))
+    return model
+
+
+def regression_metrics(y_true, y_pred):
+    y_true = np.asarray(y_true, dtype=np.float64).ravel()
+    y_pred = np.asarray(y_pred, dtype=np.float64).ravel()
+    err = y_pred - y_true
+    mse = float(np.mean(err ** 2))
+    return {
+        'mae': float(np.mean(np.abs(err))),
+        'mse': mse,
+        'rmse': float(np.sqrt(mse)),
+        'r2': float(1 - np.sum(err ** 2) / np.sum((y_true - y_true.mean()) ** 2)),
+    }
+
+
+def configure_threads(threads, deterministic=False, seed=42):
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(max(1, threads // 2))
+    tf.keras.utils.set_random_seed(seed)
+    if deterministic:
+        tf.config.experimental.enable_op_determinism()
+
+
+def train(data_path=DATA_PATH, batch_size=256, epochs=100, patience=5, hidden=(64, 32), dropout=0.2,
+          learning_rate=0.001, threads=None, seed=42, deterministic=False, artifact_root=ARTIFACT_ROOT,
+          verbose=1):
+    import tensorflow as tf
+
+    threads = threads or default_threads()
+    configure_threads(threads, deterministic, seed)
+
+    version = datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S') + '-' + file_digest(data_path)[:8]
+    out_dir = os.path.join(artifact_root, version)
+    work_dir = os.path.join(out_dir, '_work')
+    os.makedirs(work_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    rows, scaler, test_idx = split_to_disk(data_path, work_dir, seed=seed)
+    prep_seconds = time.perf_counter() - start
+
+    train_ds = make_dataset(rows['train'], scaler, batch_size, shuffle=True, seed=seed)
+    val_ds = make_dataset(rows['val'], scaler, batch_size)
+
+    model = build_model(hidden, dropout, learning_rate)
+    early = tf.keras.callbacks.EarlyStopping(monitor='val_loss', patience=patience, restore_best_weights=True)
+
+    fit_start = time.perf_counter()
+    history = model.fit(train_ds, validation_data=val_ds, epochs=epochs, callbacks=[early], verbose=verbose)
+    fit_seconds = time.perf_counter() - fit_start
+
+    test_pred = model.predict(make_dataset(rows['test'], scaler, 8192), verbose=0)
+    metrics = regression_metrics(rows['test'][:, -1], test_pred)
+    # Pins the rows split_to_disk held out, which --update gates on
+    from export import rows_digest
+    base_rows = sum(len(r) for r in rows.values())
+
+    model.save(os.path.join(out_dir, 'exam_model.h5'))
+    joblib.dump(scaler, os.path.join(out_dir, 'scaler.pkl'))
+    ENCODER.save(os.path.join(out_dir, 'schema.json'))
+
+    report = {
+        'version': version,
+        'data': {'path': data_path, 'digest': file_digest(data_path),
+                 'rows': {name: len(r) for name, r in rows.items()}},
+        'config': {'batch_size': batch_size, 'epochs': epochs, 'patience': patience, 'hidden': list(hidden),
+                   'dropout': dropout, 'learning_rate': learning_rate, 'threads': threads, 'seed': seed,
+                   'deterministic': deterministic},
+        'epochs_run': len(history.history['loss']),
+        'final_loss': float(history.history['loss'][-1]),
+        'final_val_loss': float(history.history['val_loss'][-1]),
+        'test_metrics': metrics,
+        'holdout': {'base_rows': base_rows, 'rows_digest': rows_digest(test_idx)},
+        'seconds': {'prepare': round(prep_seconds, 3), 'fit': round(fit_seconds, 3),
+                    'total': round(time.perf_counter() - start, 3)},
+    }
+    with open(os.path.join(out_dir, 'metrics.json'), 'w') as f:
+        json.dump(report, f, indent=2)
+
+    del rows
+    shutil.rmtree(work_dir, ignore_errors=True)
+    return out_dir, report
+
+
+# =============================
+# INCREMENTAL UPDATE
+# =============================
+# Warm-starts from the deployed exam_model.h5 and fine-tunes it on a new
+# cohort plus a replay sample of the rows it was originally trained on (so
+# it doesn't drift away from them), for a bounded number of epochs. The
+# deployed scaler and feature schema are reused unchanged, so the result is
+# a drop-in replacement. Old and new model are both scored on the
+# notebook's fixed 33% holdout of the base data, pinned to the base row
+# count recorded in model_card.json, which neither the replay sample nor the
+# new rows ever touch; the update only counts as promotable when it is no
+# worse there.
+UPDATE_EPOCHS = 10
+UPDATE_PATIENCE = 2
+UPDATE_LEARNING_RATE = 1e-4
+# Replay rows per new training row
+REPLAY_RATIO = 1.0
+UPDATE_VALIDATION = 0.1
+# Share of the new cohort kept out of fine-tuning to report the fit on new rows
+NEW_HOLDOUT = 0.2
+# Allowed relative RMSE increase on the fixed holdout
+MAX_REGRESSION = 0.0
+
+
+def _encoded_rows(df):
+    return np.column_stack([encode_frame(df).to_numpy(dtype=np.float32), df[TARGET].to_numpy(dtype=np.float32)])
+
+
+def update(new_data_path, base_data_path=DATA_PATH, model_path=MODEL_PATH, scaler_path=SCALER_PATH,
+           replay=REPLAY_RATIO, epochs=UPDATE_EPOCHS, patience=UPDATE_PATIENCE, batch_size=256,
+           learning_rate=UPDATE_LEARNING_RATE, max_regression=MAX_REGRESSION, threads=None, seed=42,
+           artifact_root=ARTIFACT_ROOT, verbose=1):
+    import tensorflow as tf
+
+    from evaluate import MODEL_CARD_PATH, load_json
+    from export import rows_digest
+    from inference import NumpyModel, load_keras_model
+
+    threads = threads or default_threads()
+    configure_threads(threads, seed=seed)
+    rng = np.random.default_rng(seed)
+    scaler = joblib.load(scaler_path)
+
+    version = (datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S') + '-update-' + file_digest(new_data_path)[:8])
+    out_dir = os.path.join(artifact_root, version)
+    os.makedirs(out_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    # Unknown categories in the new cohort are an error: the schema is frozen
+    new_rows = _encoded_rows(read_dataset(new_data_path, FEATURE_COLUMNS + [TARGET]))
+    rng.shuffle(new_rows)
+    n_eval = int(len(new_rows) * NEW_HOLDOUT)
+    new_eval, new_train = new_rows[:n_eval], new_rows[n_eval:]
+
+    # Same split as the notebook, over the base rows pinned in the deployed
+    # model card, so cohorts appended to the base CSV since then don't move
+    # the fixed holdout. Replay rows never come from it
+    base = read_dataset(base_data_path, FEATURE_COLUMNS + [TARGET])
+    pinned = (load_json(MODEL_CARD_PATH) or {}).get('holdout') or {}
+    base_rows = pinned.get('base_rows', len(base))
+    if base_rows > len(base):
+        raise ValueError(f"{base_data_path} has {len(base):,} rows, fewer than the {base_rows:,} "
+                         f"the holdout in {MODEL_CARD_PATH} was pinned to")
+    train_idx, test_idx = holdout_split(base_rows)
+    digest = rows_digest(test_idx)
+    if pinned.get('rows_digest', digest) != digest:
+        raise ValueError(f"The holdout rows no longer match {MODEL_CARD_PATH}; re-run `evaluate.py card`")
+    # Rows appended after the pin were never held out
+    replay_pool = np.concatenate([train_idx, np.arange(base_rows, len(base))])
+    n_replay = min(int(len(new_train) * replay), len(replay_pool))
+    replay_rows = _encoded_rows(base.iloc[np.sort(rng.choice(replay_pool, n_replay, replace=False))])
+
+    rows = np.concatenate([new_train, replay_rows])
+    rng.shuffle(rows)
+    n_val = max(1, int(len(rows) * UPDATE_VALIDATION))
+    prep_seconds = time.perf_counter() - start
+
+    model = load_keras_model(model_path)
+    model.compile(loss='mean_squared_error', optimizer=tf.keras.optimizers.Adam(learning_rate))
+    early = tf.keras.callbacks.EarlyStopping(monitor='val_loss', patience=patience, restore_best_weights=True)
+
+    fit_start = time.perf_counter()
+    history = model.fit(make_dataset(rows[n_val:], scaler, batch_size, shuffle=True, seed=seed),
+                        validation_data=make_dataset(rows[:n_val], scaler, batch_size),
+                        epochs=epochs, callbacks=[early], verbose=verbose)
+    fit_seconds = time.perf_counter() - fit_start
+
+    model.save(os.path.join(out_dir, 'exam_model.h5'))
+    # Byte-for-byte copy, so the scaler half of the fingerprint is unchanged
+    shutil.copyfile(scaler_path, os.path.join(out_dir, 'scaler.pkl'))
+    ENCODER.save(os.path.join(out_dir, 'schema.json'))
+
+    previous = NumpyModel.load(model_path)
+    updated = NumpyModel.load(os.path.join(out_dir, 'exam_model.h5'))
+    holdout_rows = _encoded_rows(base.iloc[test_idx])
+    x_test, y_test = scaler.transform(holdout_rows[:, :-1]).astype(np.float32), holdout_rows[:, -1]
+    x_new = scaler.transform(new_eval[:, :-1]).astype(np.float32) if n_eval else None
+    comparison = {
+        'holdout': {'rows': len(y_test), 'base_rows': base_rows, 'rows_digest': digest,
+                    'previous': regression_metrics(y_test, previous.predict(x_test)),
+                    'updated': regression_metrics(y_test, updated.predict(x_test))},
+        'new_rows': {'rows': n_eval,
+                     'previous': regression_metrics(new_eval[:, -1], previous.predict(x_new)) if n_eval else None,
+                     'updated': regression_metrics(new_eval[:, -1], updated.predict(x_new)) if n_eval else None},
+    }
+    rmse_before = comparison['holdout']['previous']['rmse']
+    rmse_after = comparison['holdout']['updated']['rmse']
+
+    report = {
+        'version': version,
+        'mode': 'update',
+        'base': {'model': model_path, 'fingerprint': artifact_fingerprint(model_path, scaler_path)},
+        'data': {'path': new_data_path, 'digest': file_digest(new_data_path),
+                 'rows': {'train': len(rows) - n_val, 'val': n_val, 'new_eval': n_eval,
+                          'new': len(new_train), 'replay': n_replay},
+                 'base': {'path': base_data_path, 'digest': file_digest(base_data_path)}},
+        'config': {'batch_size': batch_size, 'epochs': epochs, 'patience': patience,
+                   'learning_rate': learning_rate, 'replay': replay, 'threads': threads, 'seed': seed},
+        'epochs_run': len(history.history['loss']),
+        'final_loss': float(history.history['loss'][-1]),
+        'final_val_loss': float(history.history['val_loss'][-1]),
+        **comparison,
+        'test_metrics': comparison['holdout']['updated'],
+        'max_regression': max_regression,
+        'promotable': rmse_after <= rmse_before * (1 + max_regression),
+        'seconds': {'prepare': round(prep_seconds, 3), 'fit': round(fit_seconds, 3),
+                    'total': round(time.perf_counter() - start, 3)},
+    }
+    with open(os.path.join(out_dir, 'metrics.json'), 'w') as f:
+        json.dump(report, f, indent=2)
+    return out_dir, report
+
+
+def promote(artifact_dir, model_path=MODEL_PATH, scaler_path=SCALER_PATH, schema_path=SCHEMA_PATH,
+            folded_path=FOLDED_MODEL_PATH):
+    # Fold the scaler into the new model inside the artifact dir first, so
+    # serving keeps skipping scikit-learn, then stage every file as a temp
+    # copy and swap them in back to back. The poller never sees a folded
+    # .npz from another model/scaler pair for longer than the swap itself
+    from fold import fold
+    folded_name = os.path.basename(folded_path)
+    fold(os.path.join(artifact_dir, 'exam_model.h5'), os.path.join(artifact_dir, 'scaler.pkl'),
+         os.path.join(artifact_dir, folded_name))
+
+    staged = []
+    for name, target in (('exam_model.h5', model_path), ('scaler.pkl', scaler_path),
+                         ('schema.json', schema_path), (folded_name, folded_path)):
+        tmp = f"{target}.{os.getpid()}.tmp"
+        shutil.copyfile(os.path.join(artifact_dir, name), tmp)
+        staged.append((tmp, target))
+    for tmp, target in staged:
+        os.replace(tmp, target)
+
+    # Holdout metrics for the Dashboard/System pages; `evaluate.py card` adds k-fold CV
+    from evaluate import MODEL_CARD_PATH, model_card, save_json
+    with open(os.path.join(artifact_dir, 'metrics.json')) as f:
+        report = json.load(f)
+    base_rows = (report.get('holdout') or {}).get('base_rows')
+    save_json(model_card(model_path, scaler_path, cross_validate=False, training=report['config'], base_rows=base_rows),
+              MODEL_CARD_PATH)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the exam score model and write a versioned artifact set.")
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--update', metavar='NEW_CSV',
+                        help="Fine-tune the deployed model on these new rows instead of training from scratch")
+    parser.add_argument('--replay', type=float, default=REPLAY_RATIO,
+                        help="--update: replay rows from --data per new row (0 = new rows only)")
+    parser.add_argument('--max-regression', type=float, default=MAX_REGRESSION,
+                        help="--update: allowed relative RMSE increase on the fixed holdout")
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--epochs', type=int, default=None,
+                        help=f"Maximum epochs (default 100, or {UPDATE_EPOCHS} with --update)")
+    parser.add_argument('--patience', type=int, default=None,
+                        help=f"EarlyStopping patience (default 5, or {UPDATE_PATIENCE} with --update; the notebook used 0)")
+    parser.add_argument('--hidden', default='64,32', help="Hidden layer widths after the 11-unit input layer")
+    parser.add_argument('--dropout', type=float, default=0.2)
+    parser.add_argument('--learning-rate', type=float, default=None,
+                        help=f"Adam learning rate (default 0.001, or {UPDATE_LEARNING_RATE} with --update)")
+    parser.add_argument('--threads', type=int, default=None, help="TensorFlow threads (default: all cores)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--deterministic', action='store_true', help="Enable TF op determinism (slower)")
+    parser.add_argument('--out', default=ARTIFACT_ROOT, help="Root directory for versioned artifacts")
+    parser.add_argument('--promote', action='store_true', help="Copy the new model/scaler over the app's artifacts (with --update, only if it passes the holdout check)")
+    parser.add_argument('--quiet', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.update:
+        out_dir, report = update(
+            args.update, args.data, replay=args.replay,
+            epochs=args.epochs if args.epochs is not None else UPDATE_EPOCHS,
+            patience=args.patience if args.patience is not None else UPDATE_PATIENCE,
+            batch_size=args.batch_size,
+            learning_rate=args.learning_rate if args.learning_rate is not None else UPDATE_LEARNING_RATE,
+            max_regression=args.max_regression, threads=args.threads, seed=args.seed,
+            artifact_root=args.out, verbose=0 if args.quiet else 2
+        )
+        rows = report['data']['rows']
+        print(f"{out_dir}: {rows['new']:,} new + {rows['replay']:,} replay rows, "
+              f"{report['epochs_run']} epochs, {report['seconds']['total']}s", file=sys.stderr)
+        for name in ('holdout', 'new_rows'):
+            if report[name]['rows']:
+                before, after = report[name]['previous'], report[name]['updated']
+                print(f"  {name:<9} ({report[name]['rows']:,} rows): RMSE {before['rmse']:.3f} -> {after['rmse']:.3f}  "
+                      f"R² {before['r2']:.4f} -> {after['r2']:.4f}", file=sys.stderr)
+        if args.promote:
+            if not report['promotable']:
+                print("Not promoted: the update is worse than the deployed model on the fixed holdout", file=sys.stderr)
+                sys.exit(1)
+            promote(out_dir)
+            print(f"Promoted {out_dir} to {MODEL_PATH}, {SCALER_PATH}, {SCHEMA_PATH}", file=sys.stderr)
+        return
+
+    out_dir, report = train(
+        args.data, args.batch_size, args.epochs if args.epochs is not None else 100,
+        args.patience if args.patience is not None else 5,
+        tuple(int(h) for h in args.hidden.split(',') if h), args.dropout,
+        args.learning_rate if args.learning_rate is not None else 0.001,
+        args.threads, args.seed, args.deterministic, args.out, verbose=0 if args.quiet else 2
+    )
+    m = report['test_metrics']
+    print(f"{out_dir}: MAE {m['mae']:.3f}  RMSE {m['rmse']:.3f}  R² {m['r2']:.4f}  "
+          f"({report['epochs_run']} epochs, {report['seconds']['total']}s)", file=sys.stderr)
+    if args.promote:
+        promote(out_dir)
+        print(f"Promoted {out_dir} to {MODEL_PATH}, {SCALER_PATH}, {SCHEMA_PATH}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
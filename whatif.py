@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+from features import ENCODER
+from scoring import scale_features
+
+# =============================
+# WHAT-IF SENSITIVITY SWEEPS
+# =============================
+# Vary one feature at a time around a student profile, every variant stacked
+# into a single batch and scored in one forward pass. Category values and
+# codes come from the encoder (feature schema) paired with the model.
+
+# (min, max, step) matching the Score Prediction sliders
+NUMERIC_SWEEPS = {
+    'study_hours': (0.0, 15.0, 0.5),
+    'class_attendance': (0, 100, 5),
+    'sleep_hours': (4.0, 12.0, 0.5),
+}
+
+# Heatmap axes: the sweeps above plus age (Age input: 15-30)
+GRID_RANGES = {'age': (15, 30, 1), **NUMERIC_SWEEPS}
+
+
+def sweep_values(feature, ranges=NUMERIC_SWEEPS, encoder=ENCODER):
+    if feature in ranges:
+        low, high, step = ranges[feature]
+        values = np.round(np.arange(low, high + step / 2, step), 2)
+        if all(isinstance(v, int) for v in (low, high, step)):
+            values = values.astype(int)
+        return values.tolist()
+    return list(encoder.mappings[feature])
+
+
+def score_rows(model, scaler, rows, encoder=ENCODER):
+    features = pd.DataFrame(rows, columns=encoder.feature_columns)
+    scores = model.predict(scale_features(scaler, features), verbose=0)[:, 0]
+    return np.clip(scores, 0, 100)
+
+
+def sensitivity_sweep(profile, model, scaler, features=None, encoder=ENCODER):
+    # Returns (base_score, {feature: DataFrame[value, score, delta]})
+    mappings = encoder.mappings
+    features = features or list(NUMERIC_SWEEPS) + list(mappings)
+    base = encoder.encode_profile(profile)
+    col_index = {col: i for i, col in enumerate(encoder.feature_columns)}
+
+    rows = [base]
+    spans = []
+    for feature in features:
+        values = sweep_values(feature, encoder=encoder)
+        encoded = values if feature in NUMERIC_SWEEPS else [mappings[feature][v] for v in values]
+        block = np.tile(base, (len(values), 1))
+        block[:, col_index[feature]] = encoded
+        rows.extend(block.tolist())
+        spans.append((feature, values))
+
+    scores = score_rows(model, scaler, rows, encoder)
+    base_score = float(scores[0])
+
+    curves = {}
+    offset = 1
+    for feature, values in spans:
+        chunk = scores[offset:offset + len(values)]
+        curves[feature] = pd.DataFrame({'value': values, 'score': chunk, 'delta': chunk - base_score})
+        offset += len(values)
+    return base_score, curves
+
+
+def score_grid(profile, model, scaler, x_feature, y_feature, encoder=ENCODER):
+    # Predicted score over every (x, y) pair with the rest of the profile
+    # fixed: the whole grid is one array and one forward pass.
+    # Returns (x_values, y_values, scores[len(y), len(x)])
+    if x_feature == y_feature:
+        raise ValueError("Pick two different features")
+    col_index = {col: i for i, col in enumerate(encoder.feature_columns)}
+
+    axes = []
+    for feature in (x_feature, y_feature):
+        values = sweep_values(feature, GRID_RANGES, encoder)
+        encoded = values if feature in GRID_RANGES else [encoder.mappings[feature][v] for v in values]
+        axes.append((values, np.asarray(encoded, dtype=float)))
+    (x_values, x_encoded), (y_values, y_encoded) = axes
+
+    grid = np.tile(np.asarray(encoder.encode_profile(profile)), (len(y_values) * len(x_values), 1))
+    grid[:, col_index[x_feature]] = np.tile(x_encoded, len(y_values))
+    grid[:, col_index[y_feature]] = np.repeat(y_encoded, len(x_values))
+    scores = score_rows(model, scaler, grid, encoder)
+    return x_values, y_values, scores.reshape(len(y_values), len(x_values))
+
+
+def delta_at(curves, feature, value):
+    curve = curves[feature]
+    if feature in NUMERIC_SWEEPS:
+        # Nearest sweep step
+        return float(curve['delta'].iloc[(curve['value'] - value).abs().argmin()])
+    return float(curve.loc[curve['value'] == value, 'delta'].iloc[0])
+
+
+def best_option(curves, feature, low=None, high=None):
+    # (value, delta) of the highest-scoring sweep point, optionally within [low, high]
+    curve = curves[feature]
+    if low is not None:
+        curve = curve[curve['value'] >= low]
+    if high is not None:
+        curve = curve[curve['value'] <= high]
+    row = curve.loc[curve['score'].idxmax()]
+    return row['value'], float(row['delta'])
+
+
+def impact_label(delta):
+    if delta >= 5:
+        return "High"
+    if delta >= 3:
+        return "Medium-High"
+    if delta >= 1:
+        return "Medium"
+    return "Low"